@@ -3,14 +3,29 @@ from __future__ import annotations
 import os
 from pathlib import Path
 
-from dotenv import load_dotenv
+# The monkey-patch decision below must see SOCKETIO_ASYNC_MODE from .env, so
+# load the same files backend_app does first (override=False on both sides,
+# so loading twice is harmless). python-dotenv touches neither socket nor
+# threading, so it is safe to import before patching.
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    pass
+else:
+    _backend_dir = Path(__file__).resolve().parent
+    for _env_file in (_backend_dir / ".env", _backend_dir.parent / ".env"):
+        if _env_file.exists():
+            load_dotenv(_env_file, override=False)
+    load_dotenv(override=False)
+
+if os.getenv("SOCKETIO_ASYNC_MODE", "eventlet") == "eventlet":
+    # Must happen before any other import touches socket/threading
+    import eventlet
+
+    eventlet.monkey_patch()
 
 from backend_app import create_app
-from backend_app.extensions import socketio
-
-# Load environment variables from .env file
-env_path = Path(__file__).parent / ".env"
-load_dotenv(dotenv_path=env_path)
+from backend_app.extensions import SOCKETIO_ASYNC_MODE, socketio
 
 app = create_app()
 
@@ -18,12 +33,15 @@ app = create_app()
 if __name__ == "__main__":
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", "8000"))
-    allow_unsafe = app.config.get("ENVIRONMENT", "development") != "production"
+    run_kwargs = {}
+    if SOCKETIO_ASYNC_MODE == "threading":
+        # Only the Werkzeug dev server understands this flag
+        run_kwargs["allow_unsafe_werkzeug"] = app.config.get("ENVIRONMENT", "development") != "production"
     socketio.run(
         app,
         host=host,
         port=port,
         debug=app.config.get("DEBUG", False),
-        allow_unsafe_werkzeug=allow_unsafe,
+        **run_kwargs,
     )
 
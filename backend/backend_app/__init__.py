@@ -3,18 +3,27 @@ from __future__ import annotations
 import os
 from pathlib import Path
 
-from flask import Flask
+from flask import Flask, request
 from flask_cors import CORS
 
-# Load .env file if it exists (before reading environment variables)
+# Load .env files (before reading environment variables). Every entry point
+# imports backend_app first; app.py additionally loads the same files before
+# its eventlet monkey-patch decision.
 try:
     from dotenv import load_dotenv
-    # Load from backend directory (backend/.env)
+    # Try loading from multiple locations (in order of preference)
+    # 1. Backend directory (backend/.env)
     backend_dir = Path(__file__).parent.parent
     env_file = backend_dir / ".env"
     if env_file.exists():
         load_dotenv(env_file, override=False)
-    # Also try current working directory as fallback
+    
+    # 2. Project root (codejam25/.env)
+    env_file = backend_dir.parent / ".env"
+    if env_file.exists():
+        load_dotenv(env_file, override=False)
+    
+    # 3. Current working directory
     load_dotenv(override=False)
 except ImportError:
     # python-dotenv not installed, skip .env loading
@@ -22,11 +31,13 @@ except ImportError:
 
 from .config import Settings
 from .extensions import socketio, init_mongodb
+from .orjson_provider import ORJSONProvider
 
 
 def create_app() -> Flask:
     """Application factory for the Flask backend."""
     app = Flask(__name__)
+    app.json = ORJSONProvider(app)
 
     settings = Settings.from_env()
     app.config.update(
@@ -47,6 +58,14 @@ def create_app() -> Flask:
         supports_credentials=True,
     )
 
+    @app.before_request
+    def _short_circuit_preflight():
+        # Answer CORS preflights before blueprint dispatch; Flask-CORS still
+        # attaches its headers in after_request.
+        if request.method == "OPTIONS" and request.path.startswith(("/api/", "/auth/")):
+            return app.make_default_options_response()
+        return None
+
     socketio.init_app(app, cors_allowed_origins=cors_origins)
 
     # Initialize MongoDB
@@ -67,6 +86,3 @@ def create_app() -> Flask:
 
     return app
 
-
-app = create_app()
-
@@ -0,0 +1,17 @@
+"""Helpers shared by the authenticated blueprints."""
+
+from __future__ import annotations
+
+import re
+from typing import Optional
+
+# Same acceptance as the old split()-based parser: "Bearer <token>", any case
+_BEARER_RE = re.compile(r"\s*bearer\s+(\S+)\s*", re.IGNORECASE)
+
+
+def extract_bearer(auth_header: Optional[str]) -> Optional[str]:
+    """Extract the JWT from an `Authorization: Bearer <token>` header value."""
+    if not auth_header:
+        return None
+    match = _BEARER_RE.fullmatch(auth_header)
+    return match.group(1) if match else None
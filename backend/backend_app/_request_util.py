@@ -0,0 +1,21 @@
+"""Request helpers shared by every blueprint."""
+
+from __future__ import annotations
+
+import orjson
+from flask import g, request
+
+
+def json_payload() -> dict:
+    """Return the request's JSON object body, decoded at most once per request.
+
+    The body is read uncached and decoded with orjson, then kept on `g`;
+    anything that isn't a JSON object is treated as an empty payload.
+    """
+    if "_json" not in g:
+        try:
+            data = orjson.loads(request.get_data(cache=False))
+        except orjson.JSONDecodeError:
+            data = None
+        g._json = data if isinstance(data, dict) else {}
+    return g._json
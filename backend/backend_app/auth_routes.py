@@ -2,30 +2,20 @@ from __future__ import annotations
 
 from http import HTTPStatus
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 
+from ._auth_util import extract_bearer
+from ._request_util import json_payload as _payload
 from .services.auth_service import auth_service
 from .services.dashboard_service import dashboard_service
+from .services.token_cache import get_user_from_token
 
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 
-
-def _payload() -> dict:
-    return request.get_json(silent=True) or {}
-
-
-def _get_token_from_header() -> str:
-    """Extract JWT token from Authorization header."""
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
-        return None
-    
-    parts = auth_header.split()
-    if len(parts) != 2 or parts[0].lower() != "bearer":
-        return None
-    
-    return parts[1]
+# Constant body, serialized once; a fresh Response is still built per request
+# because after_request hooks (CORS) mutate its headers
+_LOGOUT_BODY = b'{"message":"Logout successful"}'
 
 
 @auth_bp.route("/signup", methods=["POST"])
@@ -102,12 +92,12 @@ def verify():
     Headers:
         Authorization: Bearer <token>
     """
-    token = _get_token_from_header()
+    token = extract_bearer(request.headers.get("Authorization"))
     
     if not token:
         return jsonify({"error": "No token provided"}), HTTPStatus.UNAUTHORIZED
     
-    user = auth_service.verify_token(token)
+    user = get_user_from_token(token)
     
     if not user:
         return jsonify({"error": "Invalid or expired token"}), HTTPStatus.UNAUTHORIZED
@@ -126,19 +116,19 @@ def get_current_user():
     Headers:
         Authorization: Bearer <token>
     """
-    token = _get_token_from_header()
+    token = extract_bearer(request.headers.get("Authorization"))
     
     if not token:
         return jsonify({"error": "No token provided"}), HTTPStatus.UNAUTHORIZED
     
-    user = auth_service.verify_token(token)
+    user = get_user_from_token(token)
     
     if not user:
         return jsonify({"error": "Invalid or expired token"}), HTTPStatus.UNAUTHORIZED
     
     # Get user stats
     try:
-        stats = dashboard_service.get_user_stats(str(user._id))
+        stats = dashboard_service.get_user_stats(user.id_str)
     except Exception:
         stats = None
     
@@ -160,5 +150,5 @@ def logout():
     Note: Since we're using JWT, logout is primarily handled client-side.
     This endpoint is provided for consistency but doesn't do much server-side.
     """
-    return jsonify({"message": "Logout successful"}), HTTPStatus.OK
+    return Response(_LOGOUT_BODY, status=HTTPStatus.OK, mimetype="application/json")
 
@@ -4,36 +4,24 @@ from http import HTTPStatus
 
 from flask import Blueprint, jsonify, request
 
-from .services.auth_service import auth_service
+from ._auth_util import extract_bearer
+from ._request_util import json_payload as _payload
 from .services.dashboard_service import dashboard_service
+from .services.token_cache import get_identity_from_token
 
 
 dashboard_bp = Blueprint("dashboard", __name__, url_prefix="/api")
 
-
-def _payload() -> dict:
-    return request.get_json(silent=True) or {}
-
-
-def _get_token_from_header() -> str:
-    """Extract JWT token from Authorization header."""
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
-        return None
-    
-    parts = auth_header.split()
-    if len(parts) != 2 or parts[0].lower() != "bearer":
-        return None
-    
-    return parts[1]
+MAX_GAMES_PAGE_SIZE = 100
+MAX_GAMES_SKIP = 10_000
 
 
 def _get_current_user():
-    """Get current user from token."""
-    token = _get_token_from_header()
+    """Get current user identity from token (claims only, no MongoDB lookup)."""
+    token = extract_bearer(request.headers.get("Authorization"))
     if not token:
         return None
-    return auth_service.verify_token(token)
+    return get_identity_from_token(token)
 
 
 @dashboard_bp.route("/dashboard", methods=["GET"])
@@ -50,7 +38,7 @@ def get_dashboard():
         return jsonify({"error": "Unauthorized"}), HTTPStatus.UNAUTHORIZED
     
     try:
-        dashboard_data = dashboard_service.get_user_dashboard(str(user._id))
+        dashboard_data = dashboard_service.get_user_dashboard(user.id_str)
         return jsonify(dashboard_data), HTTPStatus.OK
     except Exception as e:
         return jsonify({"error": str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
@@ -62,8 +50,8 @@ def get_user_games(user_id: str):
     Get user's game history (paginated).
     
     Query params:
-        limit: Number of games to return (default 20)
-        skip: Number of games to skip (default 0)
+        limit: Number of games to return (default 20, max 100)
+        skip: Number of games to skip (default 0, max 10000)
     """
     user = _get_current_user()
     
@@ -71,13 +59,20 @@ def get_user_games(user_id: str):
         return jsonify({"error": "Unauthorized"}), HTTPStatus.UNAUTHORIZED
     
     # Users can only view their own game history
-    if str(user._id) != user_id:
+    if user.id_str != user_id:
         return jsonify({"error": "Forbidden"}), HTTPStatus.FORBIDDEN
     
     try:
         limit = int(request.args.get("limit", 20))
         skip = int(request.args.get("skip", 0))
-        
+    except ValueError:
+        return jsonify({"error": "limit and skip must be integers"}), HTTPStatus.BAD_REQUEST
+    
+    # Bound page size and offset so one request can't force a huge scan
+    limit = max(1, min(limit, MAX_GAMES_PAGE_SIZE))
+    skip = max(0, min(skip, MAX_GAMES_SKIP))
+    
+    try:
         games = dashboard_service.get_user_games(user_id, limit=limit, skip=skip)
         return jsonify({"games": games}), HTTPStatus.OK
     except Exception as e:
@@ -171,7 +166,7 @@ def get_user_stats(user_id: str):
         return jsonify({"error": "Unauthorized"}), HTTPStatus.UNAUTHORIZED
     
     # Users can only view their own stats
-    if str(user._id) != user_id:
+    if user.id_str != user_id:
         return jsonify({"error": "Forbidden"}), HTTPStatus.FORBIDDEN
     
     try:
@@ -1,12 +1,62 @@
 from __future__ import annotations
 
+import queue
+import threading
 from typing import Any, Dict
 
 from .extensions import socketio
 
+# Emits are handed to one background worker so request handlers never wait
+# on Socket.IO fan-out; a single consumer keeps events in order
+_EVENT_QUEUE: queue.Queue = queue.Queue(maxsize=10_000)
+_worker_started = False
+_worker_lock = threading.Lock()
+
+
+def _dispatch(namespace: str, event: str, payload: Dict[str, Any]) -> None:
+    try:
+        socketio.emit(event, payload, namespace=namespace)
+    except Exception as exc:
+        print(f"⚠️ Failed to emit {event} on {namespace}: {exc}")
+
+
+def _event_worker() -> None:
+    while True:
+        _dispatch(*_EVENT_QUEUE.get())
+
+
+def _ensure_worker() -> bool:
+    """Start the emit worker once; False while there is no Socket.IO server."""
+    global _worker_started
+    if _worker_started:
+        return True
+    with _worker_lock:
+        if not _worker_started:
+            if socketio.server is None:
+                return False
+            # start_background_task picks a green thread or a real thread to
+            # match the Socket.IO async mode
+            socketio.start_background_task(_event_worker)
+            _worker_started = True
+    return True
+
+
+def _enqueue(namespace: str, event: str, payload: Dict[str, Any]) -> bool:
+    """Queue an event for the worker; False if it was dropped because the queue is full."""
+    try:
+        _EVENT_QUEUE.put_nowait((namespace, event, payload))
+    except queue.Full:
+        print(f"⚠️ Event queue full, dropping {event} on {namespace}")
+        return False
+    return True
+
 
 def _emit(namespace: str, event: str, payload: Dict[str, Any]) -> None:
-    socketio.emit(event, payload, namespace=namespace)
+    # No server means create_app() never ran (scripts, tests): nobody can be
+    # listening, so nothing is queued
+    if not _ensure_worker():
+        return
+    _enqueue(namespace, event, payload)
 
 
 def lobby_namespace(lobby_id: str) -> str:
@@ -23,4 +73,3 @@ def game_namespace(game_id: str) -> str:
 
 def emit_game_event(game_id: str, event: str, payload: Dict[str, Any]) -> None:
     _emit(game_namespace(game_id), event, payload)
-
@@ -1,19 +1,56 @@
 from __future__ import annotations
 
 import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import socketio as socketio_pkg
 
 if not hasattr(socketio_pkg.Server, "reason"):
     socketio_pkg.Server.reason = None
 
 from flask_socketio import SocketIO
-from pymongo import MongoClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, MongoClient
+
+
+def _eventlet_patched() -> bool:
+    """True once eventlet has monkey-patched the stdlib socket module."""
+    # Only app.py imports eventlet, so if it is absent nothing was patched
+    eventlet = sys.modules.get("eventlet")
+    return eventlet is not None and eventlet.patcher.is_monkey_patched("socket")
+
+
+def _resolve_async_mode() -> str:
+    """Pick the Socket.IO async mode.
+
+    "eventlet" (default) serves websockets on green threads but needs the
+    stdlib patched first, which only app.py does. Under `flask run`, test
+    scripts or anything else that imports backend_app directly, blocking
+    socket calls would stall the hub, so those fall back to "threading"
+    (Werkzeug).
+    """
+    mode = os.getenv("SOCKETIO_ASYNC_MODE", "eventlet")
+    if mode == "eventlet" and not _eventlet_patched():
+        return "threading"
+    return mode
 
-socketio = SocketIO(async_mode="threading", cors_allowed_origins="*")
+
+SOCKETIO_ASYNC_MODE = _resolve_async_mode()
+
+socketio = SocketIO(async_mode=SOCKETIO_ASYNC_MODE, cors_allowed_origins="*")
+
+# Background work for /ai/submit (image conversion, Mongo storage, AI scoring)
+# so the request returns 202 without holding a worker
+submission_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SUBMISSION_WORKERS", "16")),
+    thread_name_prefix="ai-submit",
+)
 
 # MongoDB connection
 mongo_client = None
 db = None
+_indexes_ready = False
 
 def init_mongodb():
     """Initialize MongoDB connection."""
@@ -22,43 +59,96 @@ def init_mongodb():
     mongo_uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
     database_name = os.getenv("MONGODB_DATABASE", "codejam25")
     
+    # Size the pool for the threaded server and open minPoolSize connections
+    # now rather than inside the first request
+    max_pool = int(os.getenv("MONGO_MAX_POOL", "50"))
+    min_pool = int(os.getenv("MONGO_MIN_POOL", "10"))
+    # Wire compression; pymongo skips (with a warning) any codec whose library is missing
+    compressors = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")
+
     try:
-        mongo_client = MongoClient(mongo_uri)
+        mongo_client = MongoClient(
+            mongo_uri,
+            compressors=compressors,
+            maxPoolSize=max_pool,
+            minPoolSize=min(min_pool, max_pool),
+            maxIdleTimeMS=60000,
+            serverSelectionTimeoutMS=3000,
+            waitQueueTimeoutMS=2000,
+            connect=True,
+        )
         db = mongo_client[database_name]
         
         # Test connection
         mongo_client.admin.command('ping')
         print(f"✅ Connected to MongoDB: {database_name}")
         
-        # Create indexes
-        _create_indexes()
+        # Create indexes in the background so app boot doesn't wait on Mongo
+        threading.Thread(target=_create_indexes, name="mongo-indexes", daemon=True).start()
         
         return db
     except Exception as e:
         print(f"❌ MongoDB connection failed: {e}")
         raise
 
+# Strength 2 compares case-insensitively; queries must pass the same collation
+# to use the username_ci index
+USERNAME_COLLATION = {"locale": "en", "strength": 2}
+
+# Indexes per collection; each list is sent as a single createIndexes command
+_INDEXES = {
+    "users": [
+        IndexModel("email", unique=True),
+        IndexModel("username", unique=True),
+        # Case-insensitive username lookups (GameService._get_user_by_username)
+        IndexModel("username", name="username_ci", collation=USERNAME_COLLATION),
+        IndexModel("googleId", sparse=True),
+        IndexModel("githubId", sparse=True),
+    ],
+    "games": [
+        # get_user_games: equality on player + status, then sort by completedAt
+        IndexModel([("player1.userId", ASCENDING), ("status", ASCENDING), ("completedAt", DESCENDING)]),
+        IndexModel([("player2.userId", ASCENDING), ("status", ASCENDING), ("completedAt", DESCENDING)]),
+        # get_user_stats: win/loss counts per player
+        IndexModel([("player1.userId", ASCENDING), ("player1.result", ASCENDING), ("status", ASCENDING)]),
+        IndexModel([("player2.userId", ASCENDING), ("player2.result", ASCENDING), ("status", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("createdAt", DESCENDING)]),
+        IndexModel([("completedAt", DESCENDING)]),
+    ],
+    "submissions": [
+        # The /ai/submit upsert keys on this pair and relies on the index both
+        # for lookup and for uniqueness; its game_id prefix also serves
+        # per-game queries, so no separate game_id index is needed
+        IndexModel([("game_id", ASCENDING), ("player_name", ASCENDING)], unique=True),
+        IndexModel([("created_at", DESCENDING)]),
+    ],
+}
+
+
+def _indexes_exist() -> bool:
+    """Check whether a previous boot already created every index."""
+    return all(
+        {model.document["name"] for model in models} <= set(db[collection].index_information())
+        for collection, models in _INDEXES.items()
+    )
+
+
+def indexes_ready() -> bool:
+    """Whether every index in _INDEXES (including the unique user keys) exists."""
+    return _indexes_ready
+
+
 def _create_indexes():
-    """Create indexes for User and Games collections."""
-    if db is None:
+    """Create indexes for User and Games collections (once per process)."""
+    global _indexes_ready
+    if _indexes_ready or db is None:
         return
     
-    # User indexes
-    db.users.create_index("email", unique=True)
-    db.users.create_index("username", unique=True)
-    db.users.create_index("googleId", sparse=True)
-    db.users.create_index("githubId", sparse=True)
-    
-    # Games indexes
-    db.games.create_index([("player1.userId", 1), ("completedAt", -1)])
-    db.games.create_index([("player2.userId", 1), ("completedAt", -1)])
-    db.games.create_index([("status", 1), ("createdAt", -1)])
-    db.games.create_index([("completedAt", -1)])
-    
-    # Submissions indexes
-    db.submissions.create_index([("game_id", 1), ("player_name", 1)], unique=True)
-    db.submissions.create_index([("game_id", 1)])
-    db.submissions.create_index([("created_at", -1)])
-    
-    print("✅ MongoDB indexes created")
-
+    try:
+        if not _indexes_exist():
+            for collection, models in _INDEXES.items():
+                db[collection].create_indexes(models)
+            print("✅ MongoDB indexes created")
+        _indexes_ready = True
+    except Exception as e:
+        print(f"❌ MongoDB index creation failed: {e}")
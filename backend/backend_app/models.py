@@ -4,10 +4,17 @@ from datetime import datetime, timezone
 from typing import Optional
 from bson import ObjectId
 
+_UTC = timezone.utc
+
 
 class User:
     """User model following MongoDB schema."""
     
+    __slots__ = (
+        "_id", "id_str", "email", "password", "name", "username", "avatar",
+        "googleId", "githubId", "elo", "createdAt", "updatedAt", "lastLoginAt",
+    )
+    
     def __init__(
         self,
         email: str,
@@ -24,6 +31,7 @@ class User:
         lastLoginAt: Optional[datetime] = None,
     ):
         self._id = _id or ObjectId()
+        self.id_str = str(self._id)  # Stringified once; reused by routes and to_dict
         self.email = email
         self.password = password
         self.name = name
@@ -32,22 +40,27 @@ class User:
         self.googleId = googleId
         self.githubId = githubId
         self.elo = elo
-        self.createdAt = createdAt or datetime.now(timezone.utc)
-        self.updatedAt = updatedAt or datetime.now(timezone.utc)
-        self.lastLoginAt = lastLoginAt or datetime.now(timezone.utc)
+        # One clock read covers every defaulted timestamp (none when decoding from Mongo)
+        now = None if (createdAt and updatedAt and lastLoginAt) else datetime.now(_UTC)
+        self.createdAt = createdAt or now
+        self.updatedAt = updatedAt or now
+        self.lastLoginAt = lastLoginAt or now
     
     def to_dict(self, include_password: bool = False) -> dict:
-        """Convert user to dictionary."""
+        """Convert user to dictionary.
+        
+        Datetimes are left as-is; the orjson provider serializes them to ISO 8601.
+        """
         data = {
-            "_id": str(self._id),
+            "_id": self.id_str,
             "email": self.email,
             "name": self.name,
             "username": self.username,
             "avatar": self.avatar,
             "elo": self.elo,
-            "createdAt": self.createdAt.isoformat() if self.createdAt else None,
-            "updatedAt": self.updatedAt.isoformat() if self.updatedAt else None,
-            "lastLoginAt": self.lastLoginAt.isoformat() if self.lastLoginAt else None,
+            "createdAt": self.createdAt,
+            "updatedAt": self.updatedAt,
+            "lastLoginAt": self.lastLoginAt,
         }
         
         if include_password:
@@ -92,7 +105,7 @@ class User:
         return User(
             _id=doc.get("_id"),
             email=doc["email"],
-            password=doc["password"],
+            password=doc.get("password"),  # Absent when the query projected it out
             name=doc["name"],
             username=doc["username"],
             avatar=doc.get("avatar"),
@@ -108,14 +121,17 @@ class User:
 class GamePlayer:
     """Player info within a game."""
     
+    __slots__ = ("userId", "user_id_str", "username", "result")
+    
     def __init__(self, userId: ObjectId, username: str, result: Optional[str] = None):
         self.userId = userId
+        self.user_id_str = str(userId)
         self.username = username
         self.result = result  # "win" | "loss"
     
     def to_dict(self) -> dict:
         return {
-            "userId": str(self.userId),
+            "userId": self.user_id_str,
             "username": self.username,
             "result": self.result,
         }
@@ -131,6 +147,11 @@ class GamePlayer:
 class Game:
     """Game model following MongoDB schema."""
     
+    __slots__ = (
+        "_id", "player1", "player2", "status", "duration",
+        "startedAt", "completedAt", "createdAt", "updatedAt",
+    )
+    
     def __init__(
         self,
         player1: GamePlayer,
@@ -148,23 +169,24 @@ class Game:
         self.player2 = player2
         self.status = status  # "waiting" | "active" | "completed" | "abandoned"
         self.duration = duration
-        self.startedAt = startedAt or datetime.now(timezone.utc)
+        now = None if (startedAt and createdAt and updatedAt) else datetime.now(_UTC)
+        self.startedAt = startedAt or now
         self.completedAt = completedAt
-        self.createdAt = createdAt or datetime.now(timezone.utc)
-        self.updatedAt = updatedAt or datetime.now(timezone.utc)
+        self.createdAt = createdAt or now
+        self.updatedAt = updatedAt or now
     
     def to_dict(self) -> dict:
-        """Convert game to dictionary."""
+        """Convert game to dictionary (datetimes serialized by the orjson provider)."""
         return {
             "_id": str(self._id),
             "player1": self.player1.to_dict(),
             "player2": self.player2.to_dict(),
             "status": self.status,
             "duration": self.duration,
-            "startedAt": self.startedAt.isoformat() if self.startedAt else None,
-            "completedAt": self.completedAt.isoformat() if self.completedAt else None,
-            "createdAt": self.createdAt.isoformat() if self.createdAt else None,
-            "updatedAt": self.updatedAt.isoformat() if self.updatedAt else None,
+            "startedAt": self.startedAt,
+            "completedAt": self.completedAt,
+            "createdAt": self.createdAt,
+            "updatedAt": self.updatedAt,
         }
     
     def to_mongo(self) -> dict:
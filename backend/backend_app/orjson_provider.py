@@ -0,0 +1,44 @@
+"""Flask JSON provider backed by orjson."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from flask import Response
+from flask.json.provider import JSONProvider
+
+
+# Mongo hands back naive UTC datetimes; emit every datetime as ISO 8601 with "Z".
+# Non-string keys (e.g. int-keyed score maps) are stringified like stdlib json does.
+_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Serialize the types orjson doesn't know but our payloads may contain."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONProvider(JSONProvider):
+    """Serve `jsonify` and `request.get_json` through orjson's C encoder/decoder."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # Hand orjson's bytes straight to the response; dumps() would decode
+        # them only for Werkzeug to encode them again
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=_OPTIONS)
+        return self._app.response_class(body, mimetype="application/json")
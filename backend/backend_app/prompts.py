@@ -9,27 +9,36 @@ Each prompt includes:
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from random import choice
-from typing import List
+from dataclasses import dataclass, field
+from random import shuffle
+from threading import Lock
+from typing import Iterator, List, Tuple
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Prompt:
     """A VibeCoding challenge prompt."""
     
     title: str
     description: str
-    requirements: List[str]
-    grading_criteria: List[str]
+    requirements: Tuple[str, ...]
+    grading_criteria: Tuple[str, ...]
+    _grading_context: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        # Store lists as tuples so prompts stay immutable and hashable, and
+        # build the grading context once since prompt data is static
+        object.__setattr__(self, "requirements", tuple(self.requirements))
+        object.__setattr__(self, "grading_criteria", tuple(self.grading_criteria))
+        object.__setattr__(self, "_grading_context", self._build_grading_context())
     
     def to_dict(self):
         """Convert to dictionary format."""
         return {
             "title": self.title,
             "description": self.description,
-            "requirements": self.requirements,
-            "grading_criteria": self.grading_criteria,
+            "requirements": list(self.requirements),
+            "grading_criteria": list(self.grading_criteria),
         }
     
     def get_full_prompt(self) -> str:
@@ -38,8 +47,11 @@ class Prompt:
     
     def get_grading_context(self) -> str:
         """Get the context for AI grading."""
-        requirements_text = "\n".join(f"- {req}" for req in self.requirements)
-        criteria_text = "\n".join(f"- {crit}" for crit in self.grading_criteria)
+        return self._grading_context
+    
+    def _build_grading_context(self) -> str:
+        requirements_text = "\n".join([f"- {req}" for req in self.requirements])
+        criteria_text = "\n".join([f"- {crit}" for crit in self.grading_criteria])
         
         return f"""Challenge: {self.title}
 Description: {self.description}
@@ -309,21 +321,45 @@ PROMPTS = [
     ),
 ]
 
+# Serialized once; PROMPTS never changes at runtime
+PROMPTS_DICT = [p.to_dict() for p in PROMPTS]
+# Keyed by normalized title so lookups tolerate case and surrounding whitespace
+_PROMPTS_BY_TITLE = {p.title.strip().casefold(): p for p in PROMPTS}
+
+
+def _shuffled_rounds() -> Iterator[Prompt]:
+    """Yield every prompt once per round, in a fresh random order each round."""
+    ring = list(PROMPTS)
+    while True:
+        shuffle(ring)
+        yield from ring
+
+
+# Deal prompts from a shuffled ring so consecutive games don't repeat a
+# prompt until all of them have been used; generators aren't thread-safe
+_prompt_ring = _shuffled_rounds()
+_prompt_ring_lock = Lock()
+
 
 def get_random_prompt() -> Prompt:
     """Get a random prompt for a new game."""
-    return choice(PROMPTS)
+    with _prompt_ring_lock:
+        return next(_prompt_ring)
 
 
 def get_prompt_by_title(title: str) -> Prompt | None:
-    """Get a specific prompt by title."""
-    for prompt in PROMPTS:
-        if prompt.title == title:
-            return prompt
-    return None
+    """Get a specific prompt by title (case- and whitespace-insensitive)."""
+    if not title:
+        return None
+    return _PROMPTS_BY_TITLE.get(title.strip().casefold())
 
 
 def get_all_prompts() -> List[Prompt]:
     """Get all available prompts."""
     return PROMPTS
 
+
+def get_all_prompts_dict() -> List[dict]:
+    """Get all available prompts in their serialized form."""
+    return PROMPTS_DICT
+
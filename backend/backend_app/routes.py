@@ -1,16 +1,26 @@
 from __future__ import annotations
 
-import base64
+import re
+import time
 from datetime import datetime, timezone
 from http import HTTPStatus
-from pathlib import Path
-from uuid import uuid4
+from io import BytesIO
+from urllib.parse import urlsplit
 
+import orjson
+import pybase64
 import requests
-from flask import Blueprint, jsonify, request
-
-from .events import emit_lobby_event
-from .prompts import get_all_prompts
+from bson import Binary, ObjectId
+from pymongo import ReturnDocument
+from flask import Blueprint, Response, jsonify, request
+from PIL import Image
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ._request_util import json_payload as _payload
+from .events import emit_game_event, emit_lobby_event
+from .extensions import submission_executor
+from .prompts import get_all_prompts_dict
 from .services import (
     ConflictError,
     ExternalServiceError,
@@ -25,40 +35,102 @@ from .services import (
 
 api_bp = Blueprint("api", __name__)
 
-
-def _payload() -> dict:
-    return request.get_json(silent=True) or {}
+# Plain ints for the statuses handlers return, avoiding the IntEnum member
+# lookup on every response
+HTTP_OK = int(HTTPStatus.OK)
+HTTP_CREATED = int(HTTPStatus.CREATED)
+HTTP_ACCEPTED = int(HTTPStatus.ACCEPTED)
+HTTP_NOT_MODIFIED = int(HTTPStatus.NOT_MODIFIED)
+HTTP_BAD_REQUEST = int(HTTPStatus.BAD_REQUEST)
+HTTP_NOT_FOUND = int(HTTPStatus.NOT_FOUND)
+HTTP_CONFLICT = int(HTTPStatus.CONFLICT)
+HTTP_SERVICE_UNAVAILABLE = int(HTTPStatus.SERVICE_UNAVAILABLE)
+
+# The prompt list is static, so its response body is encoded once at import
+_PROMPTS_BODY = orjson.dumps(
+    {"prompts": get_all_prompts_dict(), "count": len(get_all_prompts_dict())}
+)
 
 
 @api_bp.errorhandler(NotFoundError)
 def handle_not_found(error: NotFoundError):
-    return jsonify({"error": str(error)}), HTTPStatus.NOT_FOUND
+    return jsonify({"error": str(error)}), HTTP_NOT_FOUND
 
 
 @api_bp.errorhandler(ConflictError)
 def handle_conflict(error: ConflictError):
-    return jsonify({"error": str(error)}), HTTPStatus.CONFLICT
+    return jsonify({"error": str(error)}), HTTP_CONFLICT
 
 
 @api_bp.errorhandler(ValidationError)
 def handle_validation(error: ValidationError):
-    return jsonify({"error": str(error)}), HTTPStatus.BAD_REQUEST
+    return jsonify({"error": str(error)}), HTTP_BAD_REQUEST
 
 
 @api_bp.errorhandler(ExternalServiceError)
 def handle_external_service(error: ExternalServiceError):
-    return jsonify({"error": str(error)}), HTTPStatus.SERVICE_UNAVAILABLE
+    return jsonify({"error": str(error)}), HTTP_SERVICE_UNAVAILABLE
+
+
+
+# Remote submission images are streamed in chunks and capped in size
+IMAGE_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+MAX_IMAGE_DOWNLOAD_BYTES = 20 * 1024 * 1024
+
+# Shared session so repeated downloads from the same image host reuse
+# keep-alive connections instead of a new TCP+TLS handshake each time
+_HTTP = requests.Session()
+_HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.1),
+)
+_HTTP.mount("https://", _HTTP_ADAPTER)
+_HTTP.mount("http://", _HTTP_ADAPTER)
+
+# Fixed-shape health body; only the timestamp is filled in
+_HEALTH_TEMPLATE = b'{"status":"ok","service":"creative-battles-backend","timestamp":"%s"}'
+# [second, body]: health probes within the same second share one encoded body
+_HEALTH_CACHE = [-1, b""]
 
 
 @api_bp.route("/health", methods=["GET"])
 def health_check():
-    return jsonify(
-        {
-            "status": "ok",
-            "service": "creative-battles-backend",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-    )
+    second = int(time.time())
+    if second != _HEALTH_CACHE[0]:
+        timestamp = datetime.fromtimestamp(second, timezone.utc).isoformat()
+        _HEALTH_CACHE[1] = _HEALTH_TEMPLATE % timestamp.encode("ascii")
+        _HEALTH_CACHE[0] = second
+    return Response(_HEALTH_CACHE[1], mimetype="application/json")
+
+
+def _versioned_response(key: str, obj, snapshot):
+    """Serve `{key: obj.to_dict()}`, or a bodyless 304 if the client's copy is current.
+    
+    Services bump updated_at on every change, so it doubles as the version;
+    polling clients revalidate with If-None-Match instead of re-downloading.
+    `snapshot` is the service's locked serialiser, returning (updated_at, dict).
+    """
+    etag = str(obj.updated_at)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=HTTP_NOT_MODIFIED)
+    else:
+        version, body = snapshot(obj)
+        etag = str(version)
+        response = jsonify({key: body})
+    response.set_etag(etag, weak=True)
+    response.cache_control.no_cache = True
+    return response
+
+
+# Mutators hand back the live object after releasing its lock; responses and
+# emits serialise it under the lock again so in-place writers can't race them
+def _lobby_dict(lobby) -> dict:
+    return lobby_service.snapshot_lobby(lobby)[1]
+
+
+def _game_dict(game) -> dict:
+    return game_service.snapshot_game(game)[1]
 
 
 # Lobby endpoints ---------------------------------------------------------
@@ -68,7 +140,7 @@ def health_check():
 def create_lobby():
     data = _payload()
     lobby = lobby_service.create_lobby(data.get("host_name"))
-    return jsonify({"lobby": lobby.to_dict()}), HTTPStatus.CREATED
+    return jsonify({"lobby": _lobby_dict(lobby)}), HTTP_CREATED
 
 
 @api_bp.route("/lobby/join", methods=["POST"])
@@ -77,7 +149,7 @@ def join_lobby():
     lobby_id = data.get("lobby_id")
     player = data.get("player_name")
     lobby = lobby_service.join_lobby(lobby_id, player)
-    return jsonify({"lobby": lobby.to_dict()})
+    return jsonify({"lobby": _lobby_dict(lobby)})
 
 
 @api_bp.route("/lobby/leave", methods=["POST"])
@@ -86,13 +158,13 @@ def leave_lobby():
     lobby_id = data.get("lobby_id")
     player = data.get("player_name")
     lobby, deleted = lobby_service.leave_lobby(lobby_id, player)
-    return jsonify({"lobby": lobby.to_dict() if lobby else None, "deleted": deleted})
+    return jsonify({"lobby": _lobby_dict(lobby) if lobby else None, "deleted": deleted})
 
 
 @api_bp.route("/lobby/<lobby_id>", methods=["GET"])
 def get_lobby(lobby_id: str):
     lobby = lobby_service.get_lobby(lobby_id)
-    return jsonify({"lobby": lobby.to_dict()})
+    return _versioned_response("lobby", lobby, lobby_service.snapshot_lobby)
 
 
 @api_bp.route("/lobby/ready", methods=["POST"])
@@ -101,7 +173,7 @@ def toggle_ready():
     lobby_id = data.get("lobby_id")
     player = data.get("player_name")
     lobby = lobby_service.toggle_ready(lobby_id, player)
-    return jsonify({"lobby": lobby.to_dict()})
+    return jsonify({"lobby": _lobby_dict(lobby)})
 
 
 @api_bp.route("/lobby/<lobby_id>/start", methods=["POST"])
@@ -111,13 +183,14 @@ def start_lobby(lobby_id: str):
     assigned_image = data.get("assigned_image")
 
     lobby = lobby_service.start_lobby(lobby_id, host)
-    emit_lobby_event(lobby_id, "game_starting", {"lobby": lobby.to_dict()})
+    emit_lobby_event(lobby_id, "game_starting", {"lobby": _lobby_dict(lobby)})
 
     game = game_service.create_game(lobby.players, assigned_image=assigned_image, source="lobby")
     lobby = lobby_service.mark_started(lobby_id)
 
-    emit_lobby_event(lobby_id, "game_started", {"lobby": lobby.to_dict(), "game": game.to_dict()})
-    return jsonify({"lobby": lobby.to_dict(), "game": game.to_dict()})
+    payload = {"lobby": _lobby_dict(lobby), "game": _game_dict(game)}
+    emit_lobby_event(lobby_id, "game_started", payload)
+    return jsonify(payload)
 
 
 # Matchmaking endpoints ---------------------------------------------------
@@ -128,8 +201,8 @@ def matchmaking_join():
     data = _payload()
     result = matchmaking_service.join_queue(data.get("player_name"))
     if "game" in result:
-        result["game"] = result["game"].to_dict()
-    return jsonify(result), (HTTPStatus.CREATED if result.get("status") == "matched" else HTTPStatus.OK)
+        result["game"] = _game_dict(result["game"])
+    return jsonify(result), (HTTP_CREATED if result.get("status") == "matched" else HTTP_OK)
 
 
 @api_bp.route("/matchmaking/cancel", methods=["POST"])
@@ -148,13 +221,22 @@ def game_create():
     players = data.get("players") or []
     assigned_image = data.get("assigned_image")
     game = game_service.create_game(players, assigned_image=assigned_image, source="manual")
-    return jsonify({"game": game.to_dict()}), HTTPStatus.CREATED
+    return jsonify({"game": _game_dict(game)}), HTTP_CREATED
 
 
 @api_bp.route("/game/<game_id>", methods=["GET"])
 def game_detail(game_id: str):
     game = game_service.get_game(game_id)
-    return jsonify({"game": game.to_dict()})
+    return _versioned_response("game", game, game_service.snapshot_game)
+
+
+def _awaiting_scoring_response(game, message: str):
+    """Respond 202 with the game after code generation; scoring comes later."""
+    snapshot = _game_dict(game)
+    response = {"game": snapshot, "status": snapshot["status"]}
+    if snapshot["status"] != "completed":
+        response["message"] = message
+    return jsonify(response), HTTP_ACCEPTED
 
 
 @api_bp.route("/game/<game_id>/prompt", methods=["POST"])
@@ -163,18 +245,10 @@ def submit_prompt(game_id: str):
     game, canonical_player, sections = ai_service.submit_prompt(
         game_id, data.get("player_name"), data.get("prompt")
     )
-    
-    # Code generated successfully - no scoring yet
     # Scoring happens in /ai/submit after both players submit screenshots
-    status_code = HTTPStatus.ACCEPTED
-    
-    response = {
-        "game": game.to_dict(),
-        "status": game.status,
-        "message": "Code generated successfully. Please submit your screenshot for scoring."
-    }
-    
-    return jsonify(response), status_code
+    return _awaiting_scoring_response(
+        game, "Code generated successfully. Please submit your screenshot for scoring."
+    )
 
 
 @api_bp.route("/game/<game_id>/complete", methods=["POST"])
@@ -187,7 +261,7 @@ def complete_game(game_id: str):
         winner=data.get("winner"),
         status=data.get("status", "completed"),
     )
-    return jsonify({"game": game.to_dict()})
+    return jsonify({"game": _game_dict(game)})
 
 
 @api_bp.route("/game/<game_id>/results", methods=["GET"])
@@ -196,31 +270,36 @@ def get_game_results(game_id: str):
     try:
         game = game_service.get_game(game_id)
     except NotFoundError as e:
-        return jsonify({"error": str(e)}), HTTPStatus.NOT_FOUND
+        return jsonify({"error": str(e)}), HTTP_NOT_FOUND
     
     # Check if game is completed
     if game.status != "completed":
         return jsonify({
             "error": "Game is not completed yet",
             "status": game.status
-        }), HTTPStatus.BAD_REQUEST
+        }), HTTP_BAD_REQUEST
     
     # Get player data
     player1, player2 = game.players[0], game.players[1]
     
     # Helper to get image data URL from MongoDB submission ID
-    def get_image_data(submission_id: str) -> str:
+    def get_image_data(submission_id: ObjectId) -> str:
         """Fetch image data URL from MongoDB submission document."""
         if not submission_id:
             return ""
         try:
             from .extensions import db
-            from bson import ObjectId
             
-            submission = db.submissions.find_one({"_id": ObjectId(submission_id)})
-            if submission:
-                return submission.get("image_data", "")
-            return ""
+            submission = db.submissions.find_one({"_id": submission_id})
+            if not submission:
+                return ""
+            image_data = submission.get("image_data", "")
+            if isinstance(image_data, bytes):
+                # Stored as raw bytes; older documents hold a data URL string
+                mime_type = submission.get("mime_type", "image/png")
+                encoded = pybase64.b64encode(image_data).decode("ascii")
+                return f"data:{mime_type};base64,{encoded}"
+            return image_data
         except Exception as e:
             print(f"Error fetching submission {submission_id}: {e}")
             return ""
@@ -300,10 +379,10 @@ def get_game_results(game_id: str):
         "targetImage": game.assigned_image or "",
         "winner": game.winner or "",
         "createdAt": game.created_at.isoformat() if game.created_at else None,
-        "completedAt": game.updated_at.isoformat() if game.updated_at else None,
+        "completedAt": game.updated_at_dt.isoformat(),
     }
     
-    return jsonify(response), HTTPStatus.OK
+    return jsonify(response), HTTP_OK
 
 
 # AI endpoints ------------------------------------------------------------
@@ -315,174 +394,199 @@ def ai_generate():
     game, canonical_player, sections = ai_service.submit_prompt(
         data.get("game_id"), data.get("player_name"), data.get("prompt")
     )
-    
-    # Auto-grading commented out - grading happens in /ai/submit after image submissions
-    # # Check if both players have outputs, and if so, score the game
-    # if len(game.outputs) >= len(game.players):
-    #     try:
-    #         game = ai_service.score_game(game.id)
-    #         status_code = HTTPStatus.OK
-    #     except ValueError:
-    #         # Not all outputs ready yet, return current state
-    #         status_code = HTTPStatus.ACCEPTED
-    # else:
-    #     status_code = HTTPStatus.ACCEPTED
-    
-    status_code = HTTPStatus.ACCEPTED  # Code generated, awaiting image submissions
-    
-    response = {"game": game.to_dict(), "status": game.status}
-    if game.status != "completed":
-        response["message"] = "Awaiting image submissions for final scoring."
-    return jsonify(response), status_code
+    # Grading happens in /ai/submit after image submissions
+    return _awaiting_scoring_response(game, "Awaiting image submissions for final scoring.")
 
 
-@api_bp.route("/ai/submit", methods=["POST"])
-def ai_submit():
-    """Submit a player's final image submission for scoring."""
-    data = _payload()
-    game_id = data.get("game_id")
-    player_name = data.get("player_name")
-    image_url = data.get("image_url") or data.get("image")  # Support both field names
+# Base64 image data URLs: one match yields the media type and payload offset
+_DATA_URL_RE = re.compile(r"data:(image/[a-z0-9.+-]+);base64,", re.IGNORECASE)
+_DATA_URL_IMAGE_TYPES = frozenset({"image/png", "image/jpeg", "image/webp", "image/gif"})
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _is_opaque_png(header: bytes) -> bool:
+    """Check a file's first 26 bytes for a greyscale or RGB PNG.
     
-    if not image_url:
-        return jsonify({"error": "image_url or image is required."}), HTTPStatus.BAD_REQUEST
+    The IHDR chunk always comes first; byte 25 is its color type
+    (0 = greyscale, 2 = RGB, both without an alpha channel).
+    """
+    return (
+        len(header) >= 26
+        and header[:8] == _PNG_SIGNATURE
+        and header[12:16] == b"IHDR"
+        and header[25] in (0, 2)
+    )
+
+
+def _convert_submission_image(image_url: str) -> bytes:
+    """Load a submitted image (data URL or remote URL) and return it as PNG bytes.
     
-    if not game_id:
-        return jsonify({"error": "game_id is required."}), HTTPStatus.BAD_REQUEST
+    Raises:
+        ValueError: If the image cannot be downloaded or converted
+    """
+    try:
+        # Check if it's a base64 data URL (validated by ai_submit)
+        data_url = _DATA_URL_RE.match(image_url)
+        if data_url:
+            image_buffer = BytesIO(pybase64.b64decode(image_url[data_url.end():]))
+        else:
+            # Download image from URL, streaming into the buffer PIL reads from
+            image_buffer = BytesIO()
+            with _HTTP.get(image_url, timeout=(3, 30), stream=True) as response:
+                response.raise_for_status()
+                # Refuse oversized bodies before reading them when the size is declared
+                declared = response.headers.get("Content-Length", "")
+                if declared.isdigit() and int(declared) > MAX_IMAGE_DOWNLOAD_BYTES:
+                    raise ValueError("Image is too large.")
+                
+                for chunk in response.iter_content(chunk_size=IMAGE_DOWNLOAD_CHUNK_SIZE):
+                    image_buffer.write(chunk)
+                    if image_buffer.tell() > MAX_IMAGE_DOWNLOAD_BYTES:
+                        raise ValueError("Image is too large.")
+            image_buffer.seek(0)
+    except ValueError:
+        raise
+    except Exception as exc:
+        raise ValueError(f"Failed to process image: {exc}") from exc
     
-    if not player_name:
-        return jsonify({"error": "player_name is required."}), HTTPStatus.BAD_REQUEST
+    # Already an opaque PNG: store the original bytes without involving PIL
+    if _is_opaque_png(image_buffer.read(26)):
+        return image_buffer.getvalue()
+    image_buffer.seek(0)
     
-    # Process image data and convert to PNG
+    # Convert image to PNG format
     try:
-        from io import BytesIO
-        from PIL import Image
+        img = Image.open(image_buffer)
         
-        image_bytes = None
-        original_mime_type = None
-        
-        # Check if it's a base64 data URL
-        if image_url.startswith("data:image/"):
-            # Extract the base64 data and MIME type
-            header, encoded = image_url.split(",", 1)
-            # Determine original MIME type from header
-            if "webp" in header:
-                original_mime_type = "image/webp"
-            elif "png" in header:
-                original_mime_type = "image/png"
-            elif "jpeg" in header or "jpg" in header:
-                original_mime_type = "image/jpeg"
-            else:
-                original_mime_type = "image/webp"  # default
-            
-            # Decode base64 to get image bytes
-            image_bytes = base64.b64decode(encoded)
-        else:
-            # Download image from URL
-            response = requests.get(image_url, timeout=30)
-            response.raise_for_status()
-            
-            # Determine MIME type from response or file extension
-            content_type = response.headers.get("Content-Type", "")
-            if content_type.startswith("image/"):
-                original_mime_type = content_type
-            else:
-                # Fallback to extension
-                ext = Path(image_url).suffix.lower()
-                mime_map = {
-                    ".png": "image/png",
-                    ".jpg": "image/jpeg",
-                    ".jpeg": "image/jpeg",
-                    ".webp": "image/webp",
-                }
-                original_mime_type = mime_map.get(ext, "image/jpeg")
-            
-            image_bytes = response.content
-        
-        # Convert image to PNG format
-        try:
-            # Open image from bytes
-            img = Image.open(BytesIO(image_bytes))
-            
-            # Convert RGBA to RGB if necessary (preserve transparency by compositing on white background)
-            if img.mode == 'RGBA':
-                # Create white background
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                # Paste image with alpha channel as mask
-                rgb_img.paste(img, mask=img.split()[3])  # Use alpha channel (4th channel) as mask
-                img = rgb_img
-            elif img.mode not in ('RGB', 'L'):
-                # Convert other modes to RGB
+        if img.mode == 'RGBA':
+            if img.getchannel('A').getextrema() == (255, 255):
+                # Canvas screenshots are RGBA but fully opaque: just drop alpha
                 img = img.convert('RGB')
-            
-            # Save as PNG to bytes
-            png_buffer = BytesIO()
-            img.save(png_buffer, format='PNG', optimize=True)
-            png_bytes = png_buffer.getvalue()
-            
-            # Encode PNG bytes to base64 data URL
-            encoded = base64.b64encode(png_bytes).decode("utf-8")
-            image_data_base64 = f"data:image/png;base64,{encoded}"
-            mime_type = "image/png"  # Always PNG after conversion
-            
-        except Exception as img_exc:
-            return jsonify({"error": f"Failed to convert image to PNG: {str(img_exc)}"}), HTTPStatus.BAD_REQUEST
+            else:
+                # Composite onto a white background in one pass, then drop alpha
+                background = Image.new('RGBA', img.size, (255, 255, 255, 255))
+                img = Image.alpha_composite(background, img).convert('RGB')
+        elif img.mode not in ('RGB', 'L'):
+            # Convert other modes to RGB
+            img = img.convert('RGB')
         
+        # Fast deflate; optimize=True tried several strategies for a few % size
+        png_buffer = BytesIO()
+        img.save(png_buffer, format='PNG', compress_level=1)
     except Exception as exc:
-        return jsonify({"error": f"Failed to process image: {str(exc)}"}), HTTPStatus.BAD_REQUEST
+        raise ValueError(f"Failed to convert image to PNG: {exc}") from exc
+    
+    return png_buffer.getvalue()
+
+
+def _store_submission(game_id: str, player_name: str, png_bytes: bytes) -> ObjectId:
+    """Upsert the submission image in MongoDB and return its document ID."""
+    from .extensions import db
+    
+    submission_doc = {
+        "game_id": game_id,
+        "player_name": player_name,
+        "image_data": Binary(png_bytes),  # Raw PNG; base64 only at the response boundary
+        "mime_type": "image/png",  # Always PNG after conversion
+        "created_at": datetime.now(timezone.utc),
+    }
     
-    # Store image in MongoDB
+    # Upsert and read back the _id in one round-trip; relies on the unique
+    # (game_id, player_name) index created in extensions
+    submission = db.submissions.find_one_and_update(
+        {"game_id": game_id, "player_name": player_name},
+        {"$set": submission_doc},
+        upsert=True,
+        projection={"_id": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    return submission["_id"]
+
+
+def _process_submission(game_id: str, player_name: str, image_url: str) -> None:
+    """Convert, store and record a submission, scoring the game once both are in."""
     try:
-        from .extensions import db
-        
-        # Store in MongoDB submissions collection
-        submission_doc = {
-            "game_id": game_id,
-            "player_name": player_name,
-            "image_data": image_data_base64,  # Store as base64 data URL
-            "mime_type": mime_type,
-            "created_at": datetime.now(timezone.utc),
-        }
-        
-        # Use upsert to update if submission already exists
-        db.submissions.update_one(
-            {"game_id": game_id, "player_name": player_name},
-            {"$set": submission_doc},
-            upsert=True
-        )
-        
-        # Store MongoDB document ID in game service
-        submission = db.submissions.find_one({"game_id": game_id, "player_name": player_name})
-        submission_id = str(submission["_id"])
+        png_bytes = _convert_submission_image(image_url)
+        submission_id = _store_submission(game_id, player_name, png_bytes)
+        game_service.record_submission(game_id, player_name, submission_id)
         
+        # Only the submission that completes the set scores the game, even
+        # when both players' submissions finish at the same moment
+        if game_service.claim_scoring(game_id):
+            try:
+                ai_service.score_submissions(game_id)
+            except Exception:
+                game_service.release_scoring(game_id)
+                raise
     except Exception as exc:
-        return jsonify({"error": f"Failed to save image to MongoDB: {str(exc)}"}), HTTPStatus.INTERNAL_SERVER_ERROR
+        print(f"❌ Submission for game {game_id} by {player_name} failed: {exc}")
+        try:
+            # Polling clients see this on /game/<id> as submission_errors
+            game_service.set_submission_error(game_id, player_name, str(exc))
+        except NotFoundError:
+            pass
+        emit_game_event(
+            game_id,
+            "submission_failed",
+            {"gameId": game_id, "player": player_name, "error": str(exc)},
+        )
+
+
+# Required string fields for /ai/submit, in the order they are reported; a
+# tuple lists alternative names for the same field
+_SUBMIT_FIELDS = (("image_url", "image"), ("game_id",), ("player_name",))
+
+
+def _require_strings(data: dict, fields) -> list:
+    """Return the value of each required field, raising on the first missing one.
     
-    # Record the submission (now stores MongoDB document ID)
-    try:
-        game, canonical_player = game_service.record_submission(game_id, player_name, submission_id)
-    except NotFoundError as e:
-        return jsonify({"error": str(e)}), HTTPStatus.NOT_FOUND
-    except ValidationError as e:
-        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+    Raises:
+        ValidationError: If a field is missing, empty or not a string
+    """
+    values = []
+    for names in fields:
+        value = next((data[name] for name in names if data.get(name)), None)
+        if not isinstance(value, str):
+            raise ValidationError(f"{' or '.join(names)} is required.")
+        values.append(value)
+    return values
+
+
+@api_bp.route("/ai/submit", methods=["POST"])
+def ai_submit():
+    """Queue a player's final image submission for scoring.
     
-    # Check if both players have submitted, and if so, score the game
-    if len(game.submissions) >= len(game.players):
-        try:
-            game = ai_service.score_submissions(game.id)
-            status_code = HTTPStatus.OK
-        except ValueError as e:
-            # Not all submissions ready yet, return current state
-            status_code = HTTPStatus.ACCEPTED
-        except ExternalServiceError as e:
-            return jsonify({"error": str(e)}), HTTPStatus.SERVICE_UNAVAILABLE
-    else:
-        status_code = HTTPStatus.ACCEPTED
+    Conversion, storage and scoring run on submission_executor; clients follow
+    the outcome by polling /game/<id> or via the game socket's
+    submission_received / submission_failed events. The 202 only means the
+    submission was queued; a later failure is stored in the game's
+    `submission_errors` under the player until they resubmit.
+    """
+    data = _payload()
+    image_url, game_id, player_name = _require_strings(data, _SUBMIT_FIELDS)
     
-    response = {"game": game.to_dict(), "status": game.status}
-    if game.status != "completed":
-        response["message"] = "Awaiting second submission before scoring."
-    return jsonify(response), status_code
+    data_url = _DATA_URL_RE.match(image_url)
+    if data_url:
+        if data_url.group(1).lower() not in _DATA_URL_IMAGE_TYPES:
+            return jsonify({"error": "Unsupported image type."}), HTTP_BAD_REQUEST
+    elif urlsplit(image_url).scheme not in ("http", "https"):
+        return jsonify({"error": "image must be an image data URL or an http(s) URL."}), HTTP_BAD_REQUEST
+    
+    # Reject unknown games and players before queueing any work
+    game = game_service.get_game(game_id)
+    if player_name.lower() not in game.players_lc:
+        raise ValidationError("Player is not part of this game.")
+    
+    # A resubmission supersedes the previous attempt's failure
+    game_service.set_submission_error(game_id, player_name, None)
+    submission_executor.submit(_process_submission, game_id, player_name, image_url)
+    
+    return jsonify({
+        "game": _game_dict(game),
+        "status": "queued",
+        "message": "Submission queued for scoring.",
+    }), HTTP_ACCEPTED
 
 
 @api_bp.route("/ai/modify", methods=["POST"])
@@ -495,7 +599,7 @@ def ai_modify():
     js = data.get("js", "")
     
     if not prompt:
-        return jsonify({"error": "prompt is required."}), HTTPStatus.BAD_REQUEST
+        return jsonify({"error": "prompt is required."}), HTTP_BAD_REQUEST
     
     try:
         sections = ai_service.modify_code(prompt, html, css, js)
@@ -504,11 +608,11 @@ def ai_modify():
             "css": sections.get("css", ""),
             "js": sections.get("js", ""),
             "context": sections.get("context", ""),
-        }), HTTPStatus.OK
+        }), HTTP_OK
     except ExternalServiceError as e:
-        return jsonify({"error": str(e)}), HTTPStatus.SERVICE_UNAVAILABLE
+        return jsonify({"error": str(e)}), HTTP_SERVICE_UNAVAILABLE
     except ValidationError as e:
-        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+        return jsonify({"error": str(e)}), HTTP_BAD_REQUEST
 
 
 
@@ -518,8 +622,4 @@ def ai_modify():
 
 @api_bp.route("/prompts", methods=["GET"])
 def list_prompts():
-    prompts = get_all_prompts()
-    return jsonify({
-        "prompts": [p.to_dict() for p in prompts],
-        "count": len(prompts)
-    })
\ No newline at end of file
+    return Response(_PROMPTS_BODY, mimetype="application/json")
\ No newline at end of file
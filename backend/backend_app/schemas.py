@@ -1,41 +1,120 @@
 from __future__ import annotations
 
+import time
+from collections.abc import Iterator, Mapping, MutableMapping
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, TypeVar
+
+from bson import ObjectId
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
 
 def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+# updated_at is bumped on every lobby/game mutation, so it is kept as integer
+# nanoseconds (time.time_ns) and only turned into a datetime when read
+utc_now_ns = time.time_ns
+
+
+def ns_to_datetime(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value // 1000)
+
+
+# Lobbies and games re-serialize the same created_at/updated_at values on
+# every to_dict(); equal datetimes always map to the same UTC string
+@lru_cache(maxsize=4096)
 def serialize_dt(value: Optional[datetime]) -> Optional[str]:
     if value is None:
         return None
     return value.astimezone(timezone.utc).isoformat()
 
 
-@dataclass
+V = TypeVar("V")
+_EMPTY = object()
+
+
+class PairMap(MutableMapping[str, V]):
+    """Insertion-ordered mapping of at most two keys, one per player.
+    
+    Stands in for the per-player dicts on Lobby and Game, which never hold
+    more than two entries, at a fraction of a dict's footprint.
+    """
+    
+    __slots__ = ("_k1", "_v1", "_k2", "_v2")
+    
+    def __init__(self, initial: Optional[Mapping[str, V]] = None) -> None:
+        self._k1 = self._k2 = _EMPTY
+        self._v1 = self._v2 = None
+        if initial:
+            self.update(initial)
+    
+    def __getitem__(self, key: str) -> V:
+        if key == self._k1:
+            return self._v1
+        if key == self._k2:
+            return self._v2
+        raise KeyError(key)
+    
+    def __setitem__(self, key: str, value: V) -> None:
+        if self._k1 is _EMPTY or key == self._k1:
+            self._k1, self._v1 = key, value
+        elif self._k2 is _EMPTY or key == self._k2:
+            self._k2, self._v2 = key, value
+        else:
+            raise ValueError("PairMap holds at most two entries.")
+    
+    def __delitem__(self, key: str) -> None:
+        if key == self._k1:
+            # Shift the second entry down to keep insertion order
+            self._k1, self._v1 = self._k2, self._v2
+        elif key != self._k2:
+            raise KeyError(key)
+        self._k2, self._v2 = _EMPTY, None
+    
+    def __iter__(self) -> Iterator[str]:
+        if self._k1 is not _EMPTY:
+            yield self._k1
+        if self._k2 is not _EMPTY:
+            yield self._k2
+    
+    def __len__(self) -> int:
+        return (self._k1 is not _EMPTY) + (self._k2 is not _EMPTY)
+    
+    def __repr__(self) -> str:
+        return f"PairMap({dict(self)!r})"
+
+
+@dataclass(slots=True)
 class Lobby:
     id: str
     host: str
     players: List[str]
-    ready_state: Dict[str, bool]
+    ready_state: PairMap[bool]
     status: str
     created_at: datetime
-    updated_at: datetime
+    updated_at: int  # ns since the epoch, see utc_now_ns
 
     def to_dict(self) -> Dict[str, object]:
         return {
             "id": self.id,
             "host": self.host,
-            "players": self.players,
-            "ready_state": self.ready_state,
+            "players": list(self.players),
+            "ready_state": dict(self.ready_state),
             "status": self.status,
             "created_at": serialize_dt(self.created_at),
-            "updated_at": serialize_dt(self.updated_at),
+            "updated_at": serialize_dt(self.updated_at_dt),
         }
 
+    @property
+    def updated_at_dt(self) -> datetime:
+        return ns_to_datetime(self.updated_at)
+
     @property
     def is_full(self) -> bool:
         return len(self.players) >= 2
@@ -45,25 +124,47 @@ class Lobby:
         return self.is_full and all(self.ready_state.get(player, False) for player in self.players)
 
 
-@dataclass
+@dataclass(slots=True)
 class Game:
     id: str
     players: List[str]
     assigned_image: Optional[str]
-    prompts: Dict[str, str] = field(default_factory=dict)
-    outputs: Dict[str, str] = field(default_factory=dict)
+    prompts: PairMap[str] = field(default_factory=PairMap)
+    outputs: PairMap[str] = field(default_factory=PairMap)
     output_sections: Dict[str, Dict[str, str]] = field(default_factory=dict)  # Player -> {html, css, js}
-    submissions: Dict[str, str] = field(default_factory=dict)  # Player -> MongoDB submission document ID
-    scores: Dict[str, float] = field(default_factory=dict)  # Player -> total score
+    submissions: Dict[str, ObjectId] = field(default_factory=dict)  # Player -> MongoDB submission document ID
+    scores: PairMap[float] = field(default_factory=PairMap)  # Player -> total score
     category_scores: Dict[str, Dict[str, float]] = field(default_factory=dict)  # Player -> {category: score}
     feedback: Dict[str, Dict[str, str]] = field(default_factory=dict)  # Player -> {category: feedback}
+    submission_errors: PairMap[str] = field(default_factory=PairMap)  # Player -> why their last /ai/submit failed
     winner: Optional[str] = None
     status: str = "pending"
     created_at: datetime = field(default_factory=utc_now)
-    updated_at: datetime = field(default_factory=utc_now)
+    updated_at: int = field(default_factory=utc_now_ns)  # ns since the epoch
     source: str = "manual"
+    # (updated_at, serialized dict); services bump updated_at on every change,
+    # so a matching stamp means nothing changed
+    _dict_cache: Optional[Tuple[int, Dict[str, object]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # lowercase name -> canonical name, for case-insensitive player lookups
+    players_lc: Dict[str, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.players_lc = {player.lower(): player for player in self.players}
+
+    @property
+    def updated_at_dt(self) -> datetime:
+        return ns_to_datetime(self.updated_at)
 
     def to_dict(self) -> Dict[str, object]:
+        # Read the stamp first: writers bump it after mutating, so a dict
+        # built during a concurrent update is cached under the older stamp
+        stamp = self.updated_at
+        cached = self._dict_cache
+        if cached is not None and cached[0] == stamp:
+            return self._copy_dict(cached[1])
+        
         # Build outputs with separate HTML, CSS, JS sections
         formatted_outputs: Dict[str, Dict[str, str]] = {}
         for player in self.players:
@@ -81,22 +182,41 @@ class Game:
             else:
                 formatted_outputs[player] = {"html": "", "css": "", "js": ""}
         
-        return {
+        result = {
             "id": self.id,
-            "players": self.players,
+            "players": list(self.players),
             "assigned_image": self.assigned_image,
-            "prompts": self.prompts,
+            "prompts": dict(self.prompts),
             "outputs": formatted_outputs,
-            "submissions": self.submissions,
-            "scores": self.scores,
-            "category_scores": self.category_scores,
-            "feedback": self.feedback,
+            # Kept as ObjectId for Mongo lookups; stringified only here
+            "submissions": {player: str(oid) for player, oid in self.submissions.items()},
+            "scores": dict(self.scores),
+            "category_scores": {player: dict(cats) for player, cats in self.category_scores.items()},
+            "feedback": {player: dict(notes) for player, notes in self.feedback.items()},
+            "submission_errors": dict(self.submission_errors),
             "winner": self.winner,
             "status": self.status,
             "source": self.source,
             "created_at": serialize_dt(self.created_at),
-            "updated_at": serialize_dt(self.updated_at),
+            "updated_at": serialize_dt(self.updated_at_dt),
         }
+        self._dict_cache = (stamp, result)
+        return self._copy_dict(result)
+    
+    @staticmethod
+    def _copy_dict(result: Dict[str, object]) -> Dict[str, object]:
+        """Copy a cached to_dict() result down to its per-player containers.
+        
+        The cached dict is never handed out, so a caller editing a nested
+        field (e.g. trimming an emit payload) can't corrupt later responses.
+        """
+        copy = dict(result)
+        copy["players"] = list(result["players"])
+        for key in ("prompts", "submissions", "scores", "submission_errors"):
+            copy[key] = dict(result[key])
+        for key in ("outputs", "category_scores", "feedback"):
+            copy[key] = {player: dict(value) for player, value in result[key].items()}
+        return copy
     
     @staticmethod
     def _parse_combined_output(combined: str) -> Dict[str, str]:
@@ -104,26 +224,27 @@ class Game:
         html = ""
         css = ""
         js = ""
+        # Each search starts where the previous one ended, so the output is
+        # scanned once instead of re-slicing and re-scanning from the start
+        pos = 0
         
         # Extract CSS (between <style> tags)
         style_start = combined.find("<style>")
-        style_end = combined.find("</style>")
-        if style_start != -1 and style_end != -1:
+        style_end = combined.find("</style>", style_start + 7) if style_start != -1 else -1
+        if style_end != -1:
             css = combined[style_start + 7:style_end].strip()
             html = combined[:style_start].strip()
-            remaining = combined[style_end + 8:].strip()
-        else:
-            remaining = combined
+            pos = style_end + 8
         
         # Extract JS (between <script> tags)
-        script_start = remaining.find("<script>")
-        script_end = remaining.find("</script>")
-        if script_start != -1 and script_end != -1:
-            js = remaining[script_start + 8:script_end].strip()
+        script_start = combined.find("<script>", pos)
+        script_end = combined.find("</script>", script_start + 8) if script_start != -1 else -1
+        if script_end != -1:
+            js = combined[script_start + 8:script_end].strip()
             if not html:  # If we didn't extract HTML yet
-                html = remaining[:script_start].strip()
+                html = combined[pos:script_start].strip()
         elif not html:
-            html = remaining
+            html = combined[pos:].strip() if pos else combined
         
         return {"html": html, "css": css, "js": js}
 
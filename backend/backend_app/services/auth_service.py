@@ -1,17 +1,42 @@
 from __future__ import annotations
 
+import base64
+import hmac
 import os
-from datetime import datetime, timedelta, timezone
+import time
+from datetime import datetime, timezone
 from typing import Optional, Tuple
 
-import bcrypt
-import jwt
+import orjson
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
-from ..extensions import db
+from ..extensions import SOCKETIO_ASYNC_MODE, db, indexes_ready
 from ..models import User
 
 
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# The HS256 JWT header never changes, so it is encoded once
+_JWT_HEADER_B64 = _b64url(b'{"alg":"HS256","typ":"JWT"}')
+
+
+def _run_blocking(func, *args):
+    """Run a CPU-heavy C call without stalling the eventlet hub.
+    
+    Under eventlet every request shares one OS thread, so a ~250 ms bcrypt
+    call would freeze all of them; tpool runs it on a real thread instead.
+    In threading mode the request already has its own thread.
+    """
+    if SOCKETIO_ASYNC_MODE == "eventlet":
+        from eventlet import tpool
+        
+        return tpool.execute(func, *args)
+    return func(*args)
+
+
 class AuthService:
     """Service for handling user authentication."""
     
@@ -19,6 +44,10 @@ class AuthService:
         self.jwt_secret = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
         self.jwt_algorithm = "HS256"
         self.jwt_expiration_hours = 24
+        # bcrypt cost factor; dev/test setups can drop it to 4
+        self.bcrypt_rounds = int(os.getenv("BCRYPT_ROUNDS", "12"))
+        # Keyed HMAC state copied per token instead of re-keyed every time
+        self._jwt_hmac = hmac.new(self.jwt_secret.encode("utf-8"), digestmod="sha256")
     
     def signup(self, email: str, password: str, name: str, username: Optional[str] = None) -> Tuple[User, str]:
         """
@@ -43,14 +72,13 @@ class AuthService:
         if not username:
             username = name
         
-        # Check if user already exists
-        existing_user = db.users.find_one({"email": email})
-        if existing_user:
-            raise ValueError("User with this email already exists")
-        
-        existing_username = db.users.find_one({"username": username})
-        if existing_username:
-            raise ValueError("Username already taken")
+        # Indexes are built in the background at boot; until the unique
+        # email/username indexes exist, duplicates must be checked by hand
+        if not indexes_ready():
+            if db.users.find_one({"email": email}, projection={"_id": 1}):
+                raise ValueError("User with this email already exists")
+            if db.users.find_one({"username": username}, projection={"_id": 1}):
+                raise ValueError("Username already taken")
         
         # Hash password
         hashed_password = self._hash_password(password)
@@ -64,15 +92,28 @@ class AuthService:
             elo=10,
         )
         
-        # Save to database
-        result = db.users.insert_one(user.to_mongo())
+        # Save to database; once built, the unique email/username indexes
+        # reject duplicates atomically, closing the check-then-insert race
+        try:
+            result = db.users.insert_one(user.to_mongo())
+        except DuplicateKeyError as exc:
+            raise self._duplicate_user_error(exc) from exc
         user._id = result.inserted_id
+        user.id_str = str(user._id)
         
         # Generate JWT token
-        token = self._generate_token(user)
+        token = self._generate_token(user, now=user.createdAt)
         
         return user, token
     
+    @staticmethod
+    def _duplicate_user_error(exc: DuplicateKeyError) -> ValueError:
+        """Map a users unique-index violation to the signup error message."""
+        key_pattern = (exc.details or {}).get("keyPattern") or {}
+        if "username" in key_pattern:
+            return ValueError("Username already taken")
+        return ValueError("User with this email already exists")
+    
     def login(self, email: str, password: str) -> Tuple[User, str]:
         """
         Authenticate user and return JWT token.
@@ -101,49 +142,66 @@ class AuthService:
         if not self._verify_password(password, user.password):
             raise ValueError("Invalid email or password")
         
-        # Update last login
+        # Update last login; one timestamp serves the document, the returned
+        # user and the token's iat
+        now = datetime.now(timezone.utc)
         db.users.update_one(
             {"_id": user._id},
-            {"$set": {"lastLoginAt": datetime.now(timezone.utc)}}
+            {"$set": {"lastLoginAt": now}}
         )
-        user.lastLoginAt = datetime.now(timezone.utc)
+        user.lastLoginAt = now
+        
+        from .token_cache import invalidate_user
+        invalidate_user(user._id)
         
         # Generate JWT token
-        token = self._generate_token(user)
+        token = self._generate_token(user, now=now)
         
         return user, token
     
-    def verify_token(self, token: str) -> Optional[User]:
+    def decode_token(self, token: str) -> Optional[dict]:
         """
-        Verify JWT token and return user.
+        Verify a JWT's signature and expiry without touching the database.
         
         Args:
             token: JWT token
             
         Returns:
-            User object if valid, None otherwise
+            Decoded claims if valid, None otherwise
         """
+        import jwt  # deferred: keeps PyJWT/cryptography off the import path
+        
         try:
             payload = jwt.decode(token, self.jwt_secret, algorithms=[self.jwt_algorithm])
-            user_id = payload.get("user_id")
-            
-            if not user_id:
-                return None
-            
-            user_doc = db.users.find_one({"_id": ObjectId(user_id)})
-            if not user_doc:
-                return None
-            
-            return User.from_mongo(user_doc)
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
             return None
+        
+        if not payload.get("user_id"):
+            return None
+        return payload
+    
+    def verify_token(self, token: str) -> Optional[User]:
+        """
+        Verify JWT token and return user.
+        
+        Args:
+            token: JWT token
+            
+        Returns:
+            User object if valid, None otherwise
+        """
+        payload = self.decode_token(token)
+        if not payload:
+            return None
+        return self.get_user_by_id(payload["user_id"])
     
     def get_user_by_id(self, user_id: str) -> Optional[User]:
         """Get user by ID."""
         try:
-            user_doc = db.users.find_one({"_id": ObjectId(user_id)})
+            # Token-authenticated lookups never need the password hash
+            user_doc = db.users.find_one({"_id": ObjectId(user_id)}, projection={"password": 0})
             if not user_doc:
                 return None
             return User.from_mongo(user_doc)
@@ -152,25 +210,37 @@ class AuthService:
     
     def _hash_password(self, password: str) -> str:
         """Hash password using bcrypt."""
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+        import bcrypt  # deferred: only signup pays for loading the extension
+        
+        salt = bcrypt.gensalt(rounds=self.bcrypt_rounds)
+        hashed = _run_blocking(bcrypt.hashpw, password.encode('utf-8'), salt)
         return hashed.decode('utf-8')
     
     def _verify_password(self, password: str, hashed: str) -> bool:
         """Verify password against hash."""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        import bcrypt
+        
+        return _run_blocking(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
     
-    def _generate_token(self, user: User) -> str:
-        """Generate JWT token for user."""
+    def _generate_token(self, user: User, now: Optional[datetime] = None) -> str:
+        """Generate an HS256 JWT for user.
+        
+        Signed directly with hmac rather than PyJWT; decode_token still
+        verifies it with PyJWT. `now` lets callers reuse a timestamp they
+        already took for iat/exp.
+        """
+        issued_at = int(now.timestamp()) if now is not None else int(time.time())
         payload = {
-            "user_id": str(user._id),
+            "user_id": user.id_str,
             "email": user.email,
             "username": user.username,
-            "exp": datetime.now(timezone.utc) + timedelta(hours=self.jwt_expiration_hours),
-            "iat": datetime.now(timezone.utc),
+            "exp": issued_at + self.jwt_expiration_hours * 3600,
+            "iat": issued_at,
         }
-        token = jwt.encode(payload, self.jwt_secret, algorithm=self.jwt_algorithm)
-        return token
+        signing_input = _JWT_HEADER_B64 + b"." + _b64url(orjson.dumps(payload))
+        mac = self._jwt_hmac.copy()
+        mac.update(signing_input)
+        return (signing_input + b"." + _b64url(mac.digest())).decode("ascii")
 
 
 # Singleton instance
@@ -2,8 +2,18 @@
 
 from __future__ import annotations
 
+import os
 import re
-from uuid import uuid4
+from collections import deque
+from functools import lru_cache
+from threading import Lock
+
+_WS_RE = re.compile(r"\s+")
+
+# Random 8-hex-char id suffixes, refilled 1024 at a time from one urandom read
+_ID_POOL_BATCH = 1024
+_id_pool: deque = deque()
+_id_pool_lock = Lock()
 
 
 class ServiceError(Exception):
@@ -22,6 +32,21 @@ class ConflictError(ServiceError):
     """Raised when an operation cannot be completed due to state."""
 
 
+class StripedLock:
+    """A fixed pool of locks handed out by key hash.
+    
+    Operations on different lobbies or games take different locks (barring
+    a hash collision), so they no longer queue behind one service-wide lock.
+    """
+    
+    def __init__(self, stripes: int = 64) -> None:
+        self._locks = [Lock() for _ in range(stripes)]
+    
+    def for_key(self, key: str) -> Lock:
+        """Return the lock guarding `key`."""
+        return self._locks[hash(key) % len(self._locks)]
+
+
 def normalize_name(value: str, field: str = "name") -> str:
     """Normalize and validate a name field.
     
@@ -37,7 +62,14 @@ def normalize_name(value: str, field: str = "name") -> str:
     """
     if value is None or not isinstance(value, str):
         raise ValidationError(f"{field} is required.")
-    cleaned = re.sub(r"\s+", " ", value).strip()
+    return _normalize_str(value, field)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_str(value: str, field: str) -> str:
+    # Player names repeat on every join/ready/prompt call; invalid names
+    # raise and so are never cached
+    cleaned = _WS_RE.sub(" ", value).strip()
     if not (1 <= len(cleaned) <= 64):
         raise ValidationError(f"{field} must be 1-64 characters.")
     return cleaned
@@ -52,4 +84,17 @@ def generate_id(prefix: str) -> str:
     Returns:
         A unique ID string like 'game_abc12345'
     """
-    return f"{prefix}_{uuid4().hex[:8]}"
+    try:
+        suffix = _id_pool.popleft()
+    except IndexError:
+        suffix = _refill_id_pool()
+    return f"{prefix}_{suffix}"
+
+
+def _refill_id_pool() -> str:
+    """Refill the id pool and return one fresh suffix."""
+    with _id_pool_lock:
+        if not _id_pool:
+            raw = os.urandom(4 * _ID_POOL_BATCH).hex()
+            _id_pool.extend(raw[i:i + 8] for i in range(0, len(raw), 8))
+        return _id_pool.popleft()
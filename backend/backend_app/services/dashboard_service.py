@@ -1,16 +1,33 @@
 from __future__ import annotations
 
+from threading import Lock
 from typing import List, Optional
 from bson import ObjectId
+from cachetools import TTLCache
+from pymongo import ReturnDocument, UpdateOne
 from datetime import datetime, timezone
 
 from ..extensions import db
 from ..models import User, Game, GamePlayer
+from .token_cache import invalidate_user
+
+
+# Fields get_user_dashboard reads from the user document
+_DASHBOARD_USER_PROJECTION = {"email": 1, "name": 1, "username": 1, "avatar": 1, "elo": 1}
 
 
 class DashboardService:
     """Service for dashboard data operations."""
     
+    def __init__(self) -> None:
+        # user_id -> stats dict; /auth/me is polled on every page navigation
+        self._stats_cache: TTLCache = TTLCache(maxsize=5_000, ttl=30)
+        # user_id -> dashboard payload; history only changes when a game completes
+        self._dashboard_cache: TTLCache = TTLCache(maxsize=5_000, ttl=30)
+        # TTLCache isn't thread-safe; one lock per cache
+        self._stats_lock = Lock()
+        self._dashboard_lock = Lock()
+    
     def get_user_dashboard(self, user_id: str) -> dict:
         """
         Get user dashboard data including profile and game history.
@@ -21,8 +38,13 @@ class DashboardService:
         Returns:
             Dictionary with user info and games
         """
+        with self._dashboard_lock:
+            cached = self._dashboard_cache.get(user_id)
+        if cached is not None:
+            return cached
+        
         # Get user
-        user_doc = db.users.find_one({"_id": ObjectId(user_id)})
+        user_doc = db.users.find_one({"_id": ObjectId(user_id)}, projection=_DASHBOARD_USER_PROJECTION)
         if not user_doc:
             raise ValueError("User not found")
         
@@ -31,9 +53,9 @@ class DashboardService:
         # Get game history
         games = self.get_user_games(user_id, limit=20)
         
-        return {
+        dashboard = {
             "user": {
-                "id": str(user._id),
+                "id": user.id_str,
                 "name": user.name,
                 "email": user.email,
                 "username": user.username,
@@ -42,6 +64,10 @@ class DashboardService:
             },
             "games": games,
         }
+        
+        with self._dashboard_lock:
+            self._dashboard_cache[user_id] = dashboard
+        return dashboard
     
     def get_user_games(self, user_id: str, limit: int = 20, skip: int = 0) -> List[dict]:
         """
@@ -72,8 +98,11 @@ class DashboardService:
             {"$skip": skip},
             {"$limit": limit},
             {
+                # Shape documents exactly as the response needs them so they
+                # can be returned without being rebuilt in Python
                 "$project": {
-                    "_id": 1,
+                    "_id": 0,
+                    "id": {"$toString": "$_id"},
                     "opponent": {
                         "$cond": [
                             {"$eq": ["$player1.userId", user_oid]},
@@ -95,29 +124,26 @@ class DashboardService:
                             "$player2.result"
                         ]
                     },
-                    "duration": 1,
-                    "completedAt": 1
+                    "duration": {"$ifNull": ["$duration", None]},
+                    "completedAt": {"$ifNull": ["$completedAt", None]},
                 }
             }
         ])
         
-        result = []
-        for game in games:
-            # Get opponent's elo
-            opponent_elo = 10  # Default
-            if game.get("opponentId"):
-                opponent_doc = db.users.find_one({"_id": game["opponentId"]})
-                if opponent_doc:
-                    opponent_elo = opponent_doc.get("elo", 10)
-            
-            result.append({
-                "id": str(game["_id"]),
-                "opponent": game["opponent"],
-                "opponentElo": opponent_elo,
-                "result": game["result"],
-                "duration": game.get("duration"),
-                "completedAt": game["completedAt"].isoformat() if game.get("completedAt") else None,
-            })
+        result = list(games)
+        
+        # Opponent elos for the whole page in one query instead of one per game
+        opponent_ids = {game["opponentId"] for game in result if game.get("opponentId")}
+        elo_by_id = {}
+        if opponent_ids:
+            elo_by_id = {
+                doc["_id"]: doc.get("elo", 10)
+                for doc in db.users.find({"_id": {"$in": list(opponent_ids)}}, projection={"elo": 1})
+            }
+        
+        # completedAt stays a datetime; the orjson provider serializes it
+        for game in result:
+            game["opponentElo"] = elo_by_id.get(game.pop("opponentId", None), 10)
         
         return result
     
@@ -186,20 +212,22 @@ class DashboardService:
         game_oid = ObjectId(game_id)
         
         # Fetch game to get player IDs
-        game_doc = db.games.find_one({"_id": game_oid})
+        game_doc = db.games.find_one(
+            {"_id": game_oid}, projection={"player1.userId": 1, "player2.userId": 1}
+        )
         if not game_doc:
             raise ValueError("Game not found")
         
         player1_id = game_doc["player1"]["userId"]
         player2_id = game_doc["player2"]["userId"]
         
-        # Update elo ratings
-        # Get current elo ratings
-        player1_doc = db.users.find_one({"_id": player1_id})
-        player2_doc = db.users.find_one({"_id": player2_id})
-        
-        player1_elo = player1_doc.get("elo", 10) if player1_doc else 10
-        player2_elo = player2_doc.get("elo", 10) if player2_doc else 10
+        # Current elo ratings for both players in one query
+        elo_by_id = {
+            doc["_id"]: doc.get("elo", 10)
+            for doc in db.users.find({"_id": {"$in": [player1_id, player2_id]}}, projection={"elo": 1})
+        }
+        player1_elo = elo_by_id.get(player1_id, 10)
+        player2_elo = elo_by_id.get(player2_id, 10)
         
         # Update elo: +5 for win, -5 for loss (minimum 0)
         if player1_result == "win":
@@ -212,18 +240,17 @@ class DashboardService:
         else:  # loss
             player2_elo = max(0, player2_elo - 5)
         
-        # Update user elo ratings
-        db.users.update_one(
-            {"_id": player1_id},
-            {"$set": {"elo": player1_elo, "updatedAt": datetime.now(timezone.utc)}}
-        )
-        db.users.update_one(
-            {"_id": player2_id},
-            {"$set": {"elo": player2_elo, "updatedAt": datetime.now(timezone.utc)}}
-        )
+        # Both elo updates in one round-trip
+        now = datetime.now(timezone.utc)
+        db.users.bulk_write([
+            UpdateOne({"_id": player1_id}, {"$set": {"elo": player1_elo, "updatedAt": now}}),
+            UpdateOne({"_id": player2_id}, {"$set": {"elo": player2_elo, "updatedAt": now}}),
+        ], ordered=False)
+        invalidate_user(player1_id)
+        invalidate_user(player2_id)
         
-        # Update game
-        db.games.update_one(
+        # Update game and read back the result in the same command
+        updated_game_doc = db.games.find_one_and_update(
             {"_id": game_oid},
             {
                 "$set": {
@@ -231,14 +258,15 @@ class DashboardService:
                     "player2.result": player2_result,
                     "status": "completed",
                     "duration": duration,
-                    "completedAt": datetime.now(timezone.utc),
-                    "updatedAt": datetime.now(timezone.utc),
+                    "completedAt": now,
+                    "updatedAt": now,
                 }
-            }
+            },
+            return_document=ReturnDocument.AFTER,
         )
+        self.invalidate_user_stats(player1_id)
+        self.invalidate_user_stats(player2_id)
         
-        # Fetch and return updated game
-        updated_game_doc = db.games.find_one({"_id": game_oid})
         if not updated_game_doc:
             raise ValueError("Game not found")
         
@@ -264,32 +292,56 @@ class DashboardService:
         Returns:
             Dictionary with wins, losses, total games
         """
+        with self._stats_lock:
+            cached = self._stats_cache.get(user_id)
+        if cached is not None:
+            return cached
+        
         user_oid = ObjectId(user_id)
         
-        # Count wins
-        wins = db.games.count_documents({
-            "$or": [
-                {"player1.userId": user_oid, "player1.result": "win"},
-                {"player2.userId": user_oid, "player2.result": "win"}
-            ],
-            "status": "completed"
-        })
-        
-        # Count losses
-        losses = db.games.count_documents({
-            "$or": [
-                {"player1.userId": user_oid, "player1.result": "loss"},
-                {"player2.userId": user_oid, "player2.result": "loss"}
-            ],
-            "status": "completed"
-        })
-        
-        return {
+        def _result_count(result: str) -> list:
+            return [
+                {"$match": {"$or": [
+                    {"player1.userId": user_oid, "player1.result": result},
+                    {"player2.userId": user_oid, "player2.result": result},
+                ]}},
+                {"$count": "n"},
+            ]
+        
+        # Wins and losses in one pass over the user's completed games
+        facets = next(db.games.aggregate([
+            {
+                "$match": {
+                    "$or": [
+                        {"player1.userId": user_oid},
+                        {"player2.userId": user_oid}
+                    ],
+                    "status": "completed"
+                }
+            },
+            {"$facet": {"wins": _result_count("win"), "losses": _result_count("loss")}},
+        ]), {})
+        wins = facets["wins"][0]["n"] if facets.get("wins") else 0
+        losses = facets["losses"][0]["n"] if facets.get("losses") else 0
+        
+        stats = {
             "wins": wins,
             "losses": losses,
             "total": wins + losses,
             "winRate": round(wins / (wins + losses) * 100, 1) if (wins + losses) > 0 else 0,
         }
+        
+        with self._stats_lock:
+            self._stats_cache[user_id] = stats
+        return stats
+    
+    def invalidate_user_stats(self, user_id) -> None:
+        """Drop cached stats and dashboard for a user whose game results changed."""
+        key = str(user_id)
+        with self._stats_lock:
+            self._stats_cache.pop(key, None)
+        with self._dashboard_lock:
+            self._dashboard_cache.pop(key, None)
 
 
 # Singleton instance
@@ -2,23 +2,29 @@
 
 from __future__ import annotations
 
-from dataclasses import replace
+import os
+from collections import deque
 from datetime import datetime, timedelta, timezone
 from threading import Lock
-from typing import TYPE_CHECKING, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Deque, Dict, Optional, Tuple
 
 from bson import ObjectId
 
 from ..events import emit_game_event
-from ..extensions import db
+from ..extensions import USERNAME_COLLATION, db
 from ..models import Game as MongoGame, GamePlayer
 from ..prompts import get_random_prompt
-from ..schemas import Game, utc_now
-from .base import NotFoundError, ValidationError, generate_id, normalize_name
+from ..schemas import Game, ns_to_datetime, utc_now_ns
+from .base import NotFoundError, StripedLock, ValidationError, generate_id, normalize_name
+from .dashboard_service import dashboard_service
+from .token_cache import invalidate_user
 
 if TYPE_CHECKING:
     from typing import List
 
+# _persist_game_to_mongo only reads a player's id, username and elo
+_PERSIST_USER_PROJECTION = {"username": 1, "elo": 1}
+
 
 class GameService:
     """Service for managing game sessions.
@@ -28,7 +34,13 @@ class GameService:
     
     def __init__(self) -> None:
         self._games: Dict[str, Game] = {}
-        self._lock = Lock()
+        # Per-entity locks; single dict get/set/pop calls are atomic on their own
+        self._locks = StripedLock()
+        # Completed games stay readable for result polling, then are dropped
+        # from memory (they are persisted to Mongo); (completed_at_ns, game_id)
+        self._completed: Deque[Tuple[int, str]] = deque()
+        self._completed_lock = Lock()
+        self._retention_ns = int(os.getenv("GAME_RETENTION_SECONDS", "86400")) * 1_000_000_000
         
         # Check MongoDB connection on startup
         if db is not None:
@@ -61,7 +73,9 @@ class GameService:
         
         normalized_players = [normalize_name(player, field="player_name") for player in players]
         game_id = generate_id("game")
-        timestamp = utc_now()
+        now_ns = utc_now_ns()
+        timestamp = ns_to_datetime(now_ns)
+        self._evict_completed(now_ns)
         
         # If no assigned_image provided, select a random prompt
         if not assigned_image:
@@ -74,14 +88,15 @@ class GameService:
             assigned_image=assigned_image,
             status="pending",
             created_at=timestamp,
-            updated_at=timestamp,
+            updated_at=now_ns,
             source=source,
         )
         
-        with self._lock:
+        with self._locks.for_key(game_id):
             self._games[game_id] = game
+            snapshot = game.to_dict()
 
-        emit_game_event(game_id, "game_created", {"game": game.to_dict()})
+        emit_game_event(game_id, "game_created", {"game": snapshot})
         return game
 
     def get_game(self, game_id: str) -> Game:
@@ -96,12 +111,28 @@ class GameService:
         Raises:
             NotFoundError: If game doesn't exist
         """
-        with self._lock:
-            game = self._games.get(game_id)
+        # Polling is the steady traffic on a quiet server, so it also drives
+        # eviction; creation alone would never free anything when idle
+        self._evict_completed(utc_now_ns())
+        # Lock-free: a single dict.get is atomic under the GIL; fields may be
+        # mid-update, so serialise through snapshot_game() for a consistent view
+        game = self._games.get(game_id)
         if not game:
             raise NotFoundError("Game not found.")
         return game
 
+    def snapshot_game(self, game: Game) -> Tuple[int, Dict[str, Any]]:
+        """Serialise a game under its lock.
+        
+        Writers mutate scores/prompts/submissions in place, so an unlocked
+        to_dict() can hit a dict changing size mid-iteration.
+        
+        Returns:
+            (updated_at, game dict) taken from the same locked view
+        """
+        with self._locks.for_key(game.id):
+            return game.updated_at, game.to_dict()
+
     def record_prompt(self, game_id: str, player_name: str, prompt: str) -> Game:
         """Record a player's prompt for a game.
         
@@ -124,18 +155,13 @@ class GameService:
         if not cleaned_prompt:
             raise ValidationError("Prompt cannot be empty.")
 
-        with self._lock:
+        with self._locks.for_key(game_id):
             game = self._games.get(game_id)
             if not game:
                 raise NotFoundError("Game not found.")
             canonical_player = self._canonical_player(game, player)
             game.prompts[canonical_player] = cleaned_prompt
-            game = replace(
-                game,
-                prompts=dict(game.prompts),
-                updated_at=utc_now(),
-            )
-            self._games[game_id] = game
+            game.updated_at = utc_now_ns()
 
         emit_game_event(game_id, "prompt_submitted", {"gameId": game_id, "player": canonical_player})
         return game
@@ -164,7 +190,7 @@ class GameService:
             NotFoundError: If game doesn't exist
             ValidationError: If player is invalid
         """
-        with self._lock:
+        with self._locks.for_key(game_id):
             game = self._games.get(game_id)
             if not game:
                 raise NotFoundError("Game not found.")
@@ -179,18 +205,12 @@ class GameService:
                     "js": sections.get("js", ""),
                 }
             
-            game = replace(
-                game,
-                outputs=dict(game.outputs),
-                output_sections=dict(game.output_sections),
-                updated_at=utc_now(),
-            )
-            self._games[game_id] = game
+            game.updated_at = utc_now_ns()
 
         emit_game_event(game_id, "output_generated", {"gameId": game_id, "player": canonical_player})
         return game, canonical_player
 
-    def record_submission(self, game_id: str, player_name: str, submission_id: str) -> tuple[Game, str]:
+    def record_submission(self, game_id: str, player_name: str, submission_id: ObjectId) -> tuple[Game, str]:
         """Record a player's image submission for a game.
         
         Args:
@@ -205,22 +225,40 @@ class GameService:
             NotFoundError: If game doesn't exist
             ValidationError: If player is invalid
         """
-        with self._lock:
+        with self._locks.for_key(game_id):
             game = self._games.get(game_id)
             if not game:
                 raise NotFoundError("Game not found.")
             canonical_player = self._canonical_player(game, player_name)
             game.submissions[canonical_player] = submission_id
-            game = replace(
-                game,
-                submissions=dict(game.submissions),
-                updated_at=utc_now(),
-            )
-            self._games[game_id] = game
+            game.updated_at = utc_now_ns()
 
         emit_game_event(game_id, "submission_received", {"gameId": game_id, "player": canonical_player})
         return game, canonical_player
 
+    def set_submission_error(self, game_id: str, player_name: str, error: Optional[str]) -> None:
+        """Record why a player's last submission failed, or clear it with None.
+        
+        /ai/submit finishes in the background, so this is how polling clients
+        learn that a submission needs to be retried.
+        
+        Raises:
+            NotFoundError: If game doesn't exist
+            ValidationError: If player is invalid
+        """
+        with self._locks.for_key(game_id):
+            game = self._games.get(game_id)
+            if not game:
+                raise NotFoundError("Game not found.")
+            canonical_player = self._canonical_player(game, player_name)
+            if error is not None:
+                game.submission_errors[canonical_player] = error
+            elif canonical_player in game.submission_errors:
+                del game.submission_errors[canonical_player]
+            else:
+                return
+            game.updated_at = utc_now_ns()
+
     def mark_processing(self, game_id: str) -> Game:
         """Mark a game as processing.
         
@@ -233,19 +271,57 @@ class GameService:
         Raises:
             NotFoundError: If game doesn't exist
         """
-        with self._lock:
+        with self._locks.for_key(game_id):
             game = self._games.get(game_id)
             if not game:
                 raise NotFoundError("Game not found.")
             if game.status == "completed":
                 return game
             game.status = "processing"
-            game = replace(game, status=game.status, updated_at=utc_now())
-            self._games[game_id] = game
+            game.updated_at = utc_now_ns()
+            snapshot = game.to_dict()
+        
+        emit_game_event(game_id, "game_processing", {"game": snapshot})
+        return game
+
+    def claim_scoring(self, game_id: str) -> Optional[Game]:
+        """Atomically move a fully submitted game to processing.
+        
+        When both players submit at once, exactly one caller gets the game
+        back and runs the scorer; every other caller gets None.
+        
+        Args:
+            game_id: The game ID
+            
+        Returns:
+            The updated game if this caller should score it, None otherwise
+            
+        Raises:
+            NotFoundError: If game doesn't exist
+        """
+        with self._locks.for_key(game_id):
+            game = self._games.get(game_id)
+            if not game:
+                raise NotFoundError("Game not found.")
+            if game.status in ("processing", "completed"):
+                return None
+            if any(player not in game.submissions for player in game.players):
+                return None
+            game.status = "processing"
+            game.updated_at = utc_now_ns()
+            snapshot = game.to_dict()
         
-        emit_game_event(game_id, "game_processing", {"game": game.to_dict()})
+        emit_game_event(game_id, "game_processing", {"game": snapshot})
         return game
 
+    def release_scoring(self, game_id: str) -> None:
+        """Return a game claimed by claim_scoring to pending after scoring failed."""
+        with self._locks.for_key(game_id):
+            game = self._games.get(game_id)
+            if game and game.status == "processing":
+                game.status = "pending"
+                game.updated_at = utc_now_ns()
+
     def complete_game(
         self,
         game_id: str,
@@ -275,10 +351,18 @@ class GameService:
             NotFoundError: If game doesn't exist
             ValidationError: If player names are invalid
         """
-        with self._lock:
+        with self._locks.for_key(game_id):
             game = self._games.get(game_id)
             if not game:
                 raise NotFoundError("Game not found.")
+            # Nothing to record (e.g. a repeated failsafe call): skip the
+            # duplicate game_completed event and Mongo write
+            if (
+                not (outputs or scores or category_scores or feedback or winner)
+                and status == game.status
+                and game.winner is None
+            ):
+                return game
 
             if outputs:
                 for player in outputs:
@@ -304,21 +388,13 @@ class GameService:
 
             game.status = status
             game.winner = canonical
-            game = replace(
-                game,
-                outputs=dict(game.outputs),
-                output_sections=dict(game.output_sections),
-                submissions=dict(game.submissions),
-                scores=dict(game.scores),
-                category_scores=dict(game.category_scores),
-                feedback=dict(game.feedback),
-                winner=canonical,
-                status=game.status,
-                updated_at=utc_now(),
-            )
-            self._games[game_id] = game
+            game.updated_at = completed_at = utc_now_ns()
+            snapshot = game.to_dict()
 
-        emit_game_event(game_id, "game_completed", {"game": game.to_dict()})
+        emit_game_event(game_id, "game_completed", {"game": snapshot})
+        if status == "completed":
+            with self._completed_lock:
+                self._completed.append((completed_at, game_id))
         
         # Persist completed game to MongoDB
         print(f"🎯 complete_game() reached - about to call _persist_game_to_mongo()")
@@ -328,6 +404,33 @@ class GameService:
         
         return game
 
+    def _evict_completed(self, now_ns: int) -> None:
+        """Drop completed games older than the retention window from memory."""
+        cutoff = now_ns - self._retention_ns
+        # Unlocked peek so the read path only takes the lock when something
+        # is due; a concurrent eviction may empty the deque under us
+        try:
+            if self._completed[0][0] >= cutoff:
+                return
+        except IndexError:
+            return
+        with self._completed_lock:
+            while self._completed and self._completed[0][0] < cutoff:
+                _, game_id = self._completed.popleft()
+                with self._locks.for_key(game_id):
+                    game = self._games.get(game_id)
+                    if game is None:
+                        continue
+                    if game.updated_at < cutoff:
+                        self._games.pop(game_id, None)
+                    else:
+                        # Touched since it completed (any mutator, not only
+                        # complete_game): requeue under the newer stamp so it
+                        # is still evicted once that stamp ages out. The
+                        # deque may fall slightly out of order; an entry stuck
+                        # behind a newer one is only evicted a little late.
+                        self._completed.append((game.updated_at, game_id))
+
     def _canonical_player(self, game: Game, player_name: str) -> str:
         """Find the canonical player name (case-insensitive).
         
@@ -341,10 +444,10 @@ class GameService:
         Raises:
             ValidationError: If player is not in the game
         """
-        for player in game.players:
-            if player.lower() == player_name.lower():
-                return player
-        raise ValidationError("Player is not part of this game.")
+        canonical = game.players_lc.get(player_name.lower())
+        if canonical is None:
+            raise ValidationError("Player is not part of this game.")
+        return canonical
     
     def _get_user_by_username(self, username: str) -> Optional[dict]:
         """Look up a user by username in MongoDB.
@@ -358,13 +461,18 @@ class GameService:
         if db is None:
             return None
         try:
-            # Try exact match first
-            user = db.users.find_one({"username": username})
+            # Exact case first (served by the unique username index), so the
+            # result lands on the right account even when several usernames
+            # differ only by case
+            user = db.users.find_one({"username": username}, projection=_PERSIST_USER_PROJECTION)
             if user:
                 return user
-            
-            # Try case-insensitive match
-            user = db.users.find_one({"username": {"$regex": f"^{username}$", "$options": "i"}})
+            # Fall back to the case-insensitive username_ci index
+            user = db.users.find_one(
+                {"username": username},
+                projection=_PERSIST_USER_PROJECTION,
+                collation=USERNAME_COLLATION,
+            )
             if user:
                 print(f"   ℹ️  Found user with case-insensitive match: '{user['username']}'")
             return user
@@ -445,6 +553,8 @@ class GameService:
                 {"_id": user2_doc["_id"]},
                 {"$set": {"elo": player2_elo, "updatedAt": datetime.now(timezone.utc)}}
             )
+            invalidate_user(user1_doc["_id"])
+            invalidate_user(user2_doc["_id"])
             print(f"   - Updated elo: {player1_name}={player1_elo}, {player2_name}={player2_elo}")
             
             # Create GamePlayer objects
@@ -462,8 +572,9 @@ class GameService:
             
             # Calculate duration (rough estimate based on timestamps)
             duration = None
-            if game.created_at and game.updated_at:
-                duration = int((game.updated_at - game.created_at).total_seconds())
+            completed_at = game.updated_at_dt
+            if game.created_at:
+                duration = int((completed_at - game.created_at).total_seconds())
             
             # Create MongoDB game document
             mongo_game = MongoGame(
@@ -472,9 +583,9 @@ class GameService:
                 status="completed",
                 duration=duration,
                 startedAt=game.created_at,
-                completedAt=game.updated_at,
+                completedAt=completed_at,
                 createdAt=game.created_at,
-                updatedAt=game.updated_at,
+                updatedAt=completed_at,
             )
             
             # Check if game already exists in MongoDB (by a composite key approach)
@@ -485,10 +596,10 @@ class GameService:
                     {"player1.userId": user2_doc["_id"], "player2.userId": user1_doc["_id"]},
                 ],
                 "completedAt": {
-                    "$gte": game.updated_at - timedelta(minutes=5) if game.updated_at else datetime.now(timezone.utc),
-                    "$lte": game.updated_at + timedelta(minutes=5) if game.updated_at else datetime.now(timezone.utc),
+                    "$gte": completed_at - timedelta(minutes=5),
+                    "$lte": completed_at + timedelta(minutes=5),
                 }
-            })
+            }, projection={"_id": 1})
             
             if existing:
                 # Update existing game
@@ -501,6 +612,9 @@ class GameService:
                 # Insert new game
                 result = db.games.insert_one(mongo_game.to_mongo())
                 print(f"✅ Persisted game to MongoDB: {result.inserted_id}")
+            
+            dashboard_service.invalidate_user_stats(user1_doc["_id"])
+            dashboard_service.invalidate_user_stats(user2_doc["_id"])
                 
         except Exception as e:
             # Log error but don't fail the game completion
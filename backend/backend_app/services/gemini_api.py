@@ -1,33 +1,28 @@
 from __future__ import annotations
 
 import base64
+import hashlib
 import json
 import re
-from pathlib import Path
+from functools import lru_cache
+from threading import Lock
 from typing import Any, Dict, Optional, Tuple
-from uuid import uuid4
+
+from cachetools import TTLCache
 
 from google import genai
 from google.genai import types
 
 from ..schemas import Game, serialize_dt, utc_now
+from .base import _WS_RE, generate_id, normalize_name
 
 GEMINI_MODEL = "gemini-2.5-flash"
 
+_WORD_RE = re.compile(r"\b\w+\b")
 
-def _normalize_name(value: str, field: str = "name") -> str:
-    """Normalize player name for validation."""
-    if value is None or not isinstance(value, str):
-        raise ValueError(f"{field} is required.")
-    cleaned = re.sub(r"\s+", " ", value).strip()
-    if not (2 <= len(cleaned) <= 64):
-        raise ValueError(f"{field} must be 2-64 characters.")
-    return cleaned
-
-
-def _generate_id(prefix: str) -> str:
-    """Generate a unique ID with prefix."""
-    return f"{prefix}_{uuid4().hex[:8]}"
+# Identical /ai/modify requests (double clicks, retries) reuse the previous
+# Gemini response for this long instead of paying for another round-trip
+MODIFY_CACHE_TTL_SECONDS = 600
 
 
 def _clean_prompt(value: str) -> str:
@@ -37,12 +32,59 @@ def _clean_prompt(value: str) -> str:
     cleaned = value.strip()
     if not cleaned:
         raise ValueError("prompt cannot be empty.")
-    cleaned = re.sub(r"\s+", " ", cleaned)
+    cleaned = _WS_RE.sub(" ", cleaned)
     if len(cleaned) > 1000:
         raise ValueError("prompt must be 1000 characters or fewer.")
     return cleaned
 
 
+# Static judging rubric for score_submissions. It is kept byte-identical across
+# calls and sent before any per-game text so Gemini can cache the prefix.
+_SCORING_INSTRUCTIONS = """You are judging a creative coding competition between two players. The requirement, both players' prompts and their two screenshots (Player 1 first) follow these instructions.
+
+Evaluate both submissions based on these 5 criteria (20 points each, total 100 points):
+
+1. Visual Design and Aesthetics (20 points)
+2. Adherence to requirement (20 points)
+3. Creativity and Innovation (20 points)
+4. Prompt Clarity (20 points)
+5. Prompt Formulation (20 points)
+
+Respond ONLY with valid JSON in this exact format:
+{
+  "player1": {
+    "visual_design": <number 0-20>,
+    "adherence": <number 0-20>,
+    "creativity": <number 0-20>,
+    "prompt_clarity": <number 0-20>,
+    "prompt_formulation": <number 0-20>,
+    "feedback": {
+      "visual_design": "<feedback text>",
+      "adherence": "<feedback text>",
+      "creativity": "<feedback text>",
+      "prompt_clarity": "<feedback text>",
+      "prompt_formulation": "<feedback text>"
+    }
+  },
+  "player2": {
+    "visual_design": <number 0-20>,
+    "adherence": <number 0-20>,
+    "creativity": <number 0-20>,
+    "prompt_clarity": <number 0-20>,
+    "prompt_formulation": <number 0-20>,
+    "feedback": {
+      "visual_design": "<feedback text>",
+      "adherence": "<feedback text>",
+      "creativity": "<feedback text>",
+      "prompt_clarity": "<feedback text>",
+      "prompt_formulation": "<feedback text>"
+    }
+  }
+}
+
+Do NOT wrap the JSON in markdown fences. Return only the JSON object."""
+
+
 class ExternalServiceError(Exception):
     """Raised when an external service (e.g., Gemini API) fails."""
 
@@ -54,6 +96,8 @@ class AiService:
         self._game_service = game_service
         self._api_key = api_key
         self._client = genai.Client(api_key=api_key) if api_key else None
+        self._modify_cache: TTLCache = TTLCache(maxsize=1024, ttl=MODIFY_CACHE_TTL_SECONDS)
+        self._modify_lock = Lock()
 
     def submit_prompt(self, game_id: str, player_name: str, prompt: str) -> Tuple[Game, str, Dict[str, str]]:
         """Submit a prompt for a game and generate output immediately."""
@@ -74,11 +118,11 @@ class AiService:
 
     def preview_prompt(self, player_name: str, prompt: str) -> Dict[str, object]:
         """Generate a preview output for a prompt without creating a game."""
-        player = _normalize_name(player_name, field="player_name")
+        player = normalize_name(player_name, field="player_name")
         cleaned_prompt = _clean_prompt(prompt)
         sections = self._generate_output(cleaned_prompt)
         return {
-            "request_id": _generate_id("ai"),
+            "request_id": generate_id("ai"),
             "player": player,
             "prompt": cleaned_prompt,
             "context": sections["context"],
@@ -108,8 +152,25 @@ class AiService:
             raise ExternalServiceError("Gemini client is not configured.")
         
         cleaned_prompt = _clean_prompt(prompt)
+        key = self._modify_cache_key(cleaned_prompt, html, css, js)
+        with self._modify_lock:
+            cached = self._modify_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+        
         sections = self._modify_output(cleaned_prompt, html, css, js)
+        with self._modify_lock:
+            self._modify_cache[key] = dict(sections)
         return sections
+    
+    @staticmethod
+    def _modify_cache_key(prompt: str, html: str, css: str, js: str) -> str:
+        """Digest of a modify request; NUL separators keep field boundaries unambiguous."""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (prompt, html, css, js):
+            digest.update((part or "").encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
 
     def score_game(self, game_id: str, *, outputs: Optional[Dict[str, str]] = None) -> Game:
         """Score a game by comparing player outputs."""
@@ -125,7 +186,7 @@ class AiService:
         scores = {
             player: self._score_output(game.outputs[player]) for player in game.players
         }
-        winner = max(scores.items(), key=lambda item: item[1])[0] if scores else None
+        winner = self._pick_winner(scores)
         return self._game_service.complete_game(
             game_id,
             scores=scores,
@@ -133,14 +194,24 @@ class AiService:
             status="completed",
         )
 
+    @staticmethod
+    def _pick_winner(scores: Dict[str, float]) -> Optional[str]:
+        """Highest-scoring player; ties go to the first player, as with max()."""
+        if not scores:
+            return None
+        if len(scores) == 2:
+            (first, first_score), (second, second_score) = scores.items()
+            return first if first_score >= second_score else second
+        return max(scores, key=scores.__getitem__)
+
     @staticmethod
     def _resolve_player(game: Game, player_name: str) -> str:
         """Resolve player name to canonical form."""
-        normalized = _normalize_name(player_name, field="player_name")
-        for player in game.players:
-            if player.lower() == normalized.lower():
-                return player
-        raise ValueError("Player is not part of this game.")
+        normalized = normalize_name(player_name, field="player_name")
+        canonical = game.players_lc.get(normalized.lower())
+        if canonical is None:
+            raise ValueError("Player is not part of this game.")
+        return canonical
 
     def _generate_output(self, prompt: str) -> Dict[str, str]:
         """Generate HTML/CSS/JS output from prompt using Gemini API."""
@@ -323,9 +394,10 @@ class AiService:
         return parsed
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def _score_output(output: str) -> float:
         """Score an output based on length and vocabulary diversity."""
-        unique_words = len(set(re.findall(r"\b\w+\b", output.lower())))
+        unique_words = len({match.group() for match in _WORD_RE.finditer(output.lower())})
         length_score = min(len(output) * 0.02, 70)
         diversity_score = min(unique_words * 0.5, 30)
         return round(length_score + diversity_score, 2)
@@ -595,23 +667,30 @@ class AiService:
         # Fetch images from MongoDB
         try:
             from ..extensions import db
-            from bson import ObjectId
             
-            submission1 = db.submissions.find_one({"_id": ObjectId(submission1_id)})
-            submission2 = db.submissions.find_one({"_id": ObjectId(submission2_id)})
+            # Both submissions in one round-trip
+            submission_oids = [submission1_id, submission2_id]
+            found = {
+                doc["_id"]: doc
+                for doc in db.submissions.find({"_id": {"$in": submission_oids}})
+            }
+            submission1 = found.get(submission_oids[0])
+            submission2 = found.get(submission_oids[1])
             
             if not submission1 or not submission2:
                 raise ExternalServiceError("Submission images not found in MongoDB")
             
-            # Extract base64 data from data URL
-            image1_data_url = submission1.get("image_data", "")
-            image2_data_url = submission2.get("image_data", "")
+            image1_data = submission1.get("image_data", "")
+            image2_data = submission2.get("image_data", "")
             
-            if not image1_data_url or not image2_data_url:
+            if not image1_data or not image2_data:
                 raise ExternalServiceError("Image data not found in submission documents")
             
-            # Parse data URLs: "data:image/png;base64,<data>" (all images are stored as PNG)
-            def parse_data_url(data_url: str) -> tuple[bytes, str]:
+            # Images are stored as raw PNG bytes; older documents hold a
+            # "data:image/png;base64,<data>" URL instead
+            def load_image(submission: dict, data_url) -> tuple[bytes, str]:
+                if isinstance(data_url, bytes):
+                    return data_url, submission.get("mime_type", "image/png")
                 if not data_url.startswith("data:image/"):
                     raise ValueError("Invalid data URL format")
                 
@@ -621,8 +700,8 @@ class AiService:
                 image_bytes = base64.b64decode(encoded)
                 return image_bytes, mime_type
             
-            image1_bytes, mime1 = parse_data_url(image1_data_url)
-            image2_bytes, mime2 = parse_data_url(image2_data_url)
+            image1_bytes, mime1 = load_image(submission1, image1_data)
+            image2_bytes, mime2 = load_image(submission2, image2_data)
             
             # Ensure both images are PNG (they should be, but verify)
             if mime1 != "image/png":
@@ -642,52 +721,14 @@ class AiService:
         prompt1 = game.prompts[player1]
         prompt2 = game.prompts[player2]
         
-        scoring_prompt = f"""You are judging a creative coding competition. Two players have submitted their work based on the requirement: "{requirement}".
-
-Player 1 ({player1}) prompt: "{prompt1}"
-Player 2 ({player2}) prompt: "{prompt2}"
-
-Evaluate both submissions based on these 5 criteria (20 points each, total 100 points):
-
-1. Visual Design and Aesthetics (20 points)
-2. Adherence to requirement (20 points)
-3. Creativity and Innovation (20 points)
-4. Prompt Clarity (20 points)
-5. Prompt Formulation (20 points)
-
-Respond ONLY with valid JSON in this exact format:
-{{
-  "player1": {{
-    "visual_design": <number 0-20>,
-    "adherence": <number 0-20>,
-    "creativity": <number 0-20>,
-    "prompt_clarity": <number 0-20>,
-    "prompt_formulation": <number 0-20>,
-    "feedback": {{
-      "visual_design": "<feedback text>",
-      "adherence": "<feedback text>",
-      "creativity": "<feedback text>",
-      "prompt_clarity": "<feedback text>",
-      "prompt_formulation": "<feedback text>"
-    }}
-  }},
-  "player2": {{
-    "visual_design": <number 0-20>,
-    "adherence": <number 0-20>,
-    "creativity": <number 0-20>,
-    "prompt_clarity": <number 0-20>,
-    "prompt_formulation": <number 0-20>,
-    "feedback": {{
-      "visual_design": "<feedback text>",
-      "adherence": "<feedback text>",
-      "creativity": "<feedback text>",
-      "prompt_clarity": "<feedback text>",
-      "prompt_formulation": "<feedback text>"
-    }}
-  }}
-}}
-
-Do NOT wrap the JSON in markdown fences. Return only the JSON object."""
+        # Static rubric first so Gemini's implicit prompt cache can reuse the
+        # prefix across games; per-game details follow it
+        scoring_prompt = (
+            f"{_SCORING_INSTRUCTIONS}\n\n"
+            f"Two players have submitted their work based on the requirement: \"{requirement}\".\n\n"
+            f"Player 1 ({player1}) prompt: \"{prompt1}\"\n"
+            f"Player 2 ({player2}) prompt: \"{prompt2}\""
+        )
         
         try:
             # Call Gemini API with both images
@@ -763,14 +804,9 @@ Do NOT wrap the JSON in markdown fences. Return only the JSON object."""
             }
             
             # Determine winner based on total score
-            winner = max(scores.items(), key=lambda item: item[1])[0] if scores else None
-            
-            # Update game with scores, category scores, and feedback
-            game.scores = scores
-            game.category_scores = category_scores
-            game.feedback = feedback
-            game.winner = winner
+            winner = self._pick_winner(scores)
             
+            # complete_game records scores, category scores, and feedback
             return self._game_service.complete_game(
                 game_id,
                 scores=scores,
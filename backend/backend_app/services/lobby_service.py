@@ -2,13 +2,11 @@
 
 from __future__ import annotations
 
-from dataclasses import replace
-from threading import Lock
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from ..events import emit_lobby_event
-from ..schemas import Lobby, utc_now
-from .base import ConflictError, NotFoundError, ValidationError, generate_id, normalize_name
+from ..schemas import Lobby, PairMap, ns_to_datetime, utc_now_ns
+from .base import ConflictError, NotFoundError, StripedLock, ValidationError, generate_id, normalize_name
 
 
 class LobbyService:
@@ -19,7 +17,8 @@ class LobbyService:
     
     def __init__(self) -> None:
         self._lobbies: Dict[str, Lobby] = {}
-        self._lock = Lock()
+        # Per-entity locks; single dict get/set/pop calls are atomic on their own
+        self._locks = StripedLock()
 
     def create_lobby(self, host_name: str) -> Lobby:
         """Create a new lobby with a host.
@@ -35,22 +34,24 @@ class LobbyService:
         """
         host = normalize_name(host_name, field="host_name")
         lobby_id = generate_id("lobby")
-        timestamp = utc_now()
+        now_ns = utc_now_ns()
+        timestamp = ns_to_datetime(now_ns)
         
         lobby = Lobby(
             id=lobby_id,
             host=host,
             players=[host],
-            ready_state={host: False},
+            ready_state=PairMap({host: False}),
             status="waiting",
             created_at=timestamp,
-            updated_at=timestamp,
+            updated_at=now_ns,
         )
         
-        with self._lock:
+        with self._locks.for_key(lobby_id):
             self._lobbies[lobby_id] = lobby
+            snapshot = lobby.to_dict()
 
-        emit_lobby_event(lobby_id, "player_joined", {"lobby": lobby.to_dict(), "player": host})
+        emit_lobby_event(lobby_id, "player_joined", {"lobby": snapshot, "player": host})
         return lobby
 
     def join_lobby(self, lobby_id: str, player_name: str) -> Lobby:
@@ -70,7 +71,7 @@ class LobbyService:
         """
         player = normalize_name(player_name, field="player_name")
         
-        with self._lock:
+        with self._locks.for_key(lobby_id):
             lobby = self._lobbies.get(lobby_id)
             if not lobby:
                 raise NotFoundError("Lobby not found.")
@@ -82,18 +83,13 @@ class LobbyService:
             lobby.players.append(player)
             lobby.ready_state[player] = False
             lobby.status = "full"
-            lobby = replace(
-                lobby, 
-                players=list(lobby.players), 
-                ready_state=dict(lobby.ready_state), 
-                status=lobby.status, 
-                updated_at=utc_now()
-            )
-            self._lobbies[lobby_id] = lobby
+            lobby.updated_at = utc_now_ns()
+            snapshot = lobby.to_dict()
+            is_full = lobby.is_full
 
-        emit_lobby_event(lobby_id, "player_joined", {"lobby": lobby.to_dict(), "player": player})
-        if lobby.is_full:
-            emit_lobby_event(lobby_id, "lobby_full", {"lobby": lobby.to_dict()})
+        emit_lobby_event(lobby_id, "player_joined", {"lobby": snapshot, "player": player})
+        if is_full:
+            emit_lobby_event(lobby_id, "lobby_full", {"lobby": snapshot})
         return lobby
 
     def leave_lobby(self, lobby_id: str, player_name: str) -> Tuple[Optional[Lobby], bool]:
@@ -112,7 +108,7 @@ class LobbyService:
         """
         player = normalize_name(player_name, field="player_name")
         
-        with self._lock:
+        with self._locks.for_key(lobby_id):
             lobby = self._lobbies.get(lobby_id)
             if not lobby:
                 raise NotFoundError("Lobby not found.")
@@ -128,14 +124,7 @@ class LobbyService:
                 self._lobbies.pop(lobby_id, None)
             else:
                 lobby.status = "waiting" if not lobby.is_full else "full"
-                lobby = replace(
-                    lobby,
-                    players=list(lobby.players),
-                    ready_state=dict(lobby.ready_state),
-                    status=lobby.status,
-                    updated_at=utc_now(),
-                )
-                self._lobbies[lobby_id] = lobby
+                lobby.updated_at = utc_now_ns()
 
         emit_lobby_event(lobby_id, "player_left", {"lobbyId": lobby_id, "player": player})
         return (lobby if not deleted else None, deleted)
@@ -156,7 +145,7 @@ class LobbyService:
         """
         player = normalize_name(player_name, field="player_name")
         
-        with self._lock:
+        with self._locks.for_key(lobby_id):
             lobby = self._lobbies.get(lobby_id)
             if not lobby:
                 raise NotFoundError("Lobby not found.")
@@ -166,18 +155,13 @@ class LobbyService:
             current = lobby.ready_state.get(player, False)
             lobby.ready_state[player] = not current
             lobby.status = "ready" if lobby.everyone_ready else ("full" if lobby.is_full else "waiting")
-            lobby = replace(
-                lobby,
-                ready_state=dict(lobby.ready_state),
-                status=lobby.status,
-                updated_at=utc_now(),
-            )
-            self._lobbies[lobby_id] = lobby
+            lobby.updated_at = utc_now_ns()
+            snapshot = lobby.to_dict()
 
         emit_lobby_event(
             lobby_id, 
             "player_ready", 
-            {"lobby": lobby.to_dict(), "player": player, "ready": lobby.ready_state[player]}
+            {"lobby": snapshot, "player": player, "ready": not current}
         )
         return lobby
 
@@ -198,7 +182,7 @@ class LobbyService:
         """
         host = normalize_name(host_name, field="host_name")
         
-        with self._lock:
+        with self._locks.for_key(lobby_id):
             lobby = self._lobbies.get(lobby_id)
             if not lobby:
                 raise NotFoundError("Lobby not found.")
@@ -208,8 +192,7 @@ class LobbyService:
                 raise ConflictError("Both players must be ready before starting.")
 
             lobby.status = "starting"
-            lobby = replace(lobby, status=lobby.status, updated_at=utc_now())
-            self._lobbies[lobby_id] = lobby
+            lobby.updated_at = utc_now_ns()
 
         return lobby
 
@@ -225,13 +208,12 @@ class LobbyService:
         Raises:
             NotFoundError: If lobby doesn't exist
         """
-        with self._lock:
+        with self._locks.for_key(lobby_id):
             lobby = self._lobbies.get(lobby_id)
             if not lobby:
                 raise NotFoundError("Lobby not found.")
             lobby.status = "started"
-            lobby = replace(lobby, status=lobby.status, updated_at=utc_now())
-            self._lobbies[lobby_id] = lobby
+            lobby.updated_at = utc_now_ns()
         return lobby
 
     def get_lobby(self, lobby_id: str) -> Lobby:
@@ -246,8 +228,14 @@ class LobbyService:
         Raises:
             NotFoundError: If lobby doesn't exist
         """
-        with self._lock:
-            lobby = self._lobbies.get(lobby_id)
+        # Lock-free: a single dict.get is atomic under the GIL; writers mutate
+        # the stored lobby in place, so serialise through snapshot_lobby()
+        lobby = self._lobbies.get(lobby_id)
         if not lobby:
             raise NotFoundError("Lobby not found.")
         return lobby
+
+    def snapshot_lobby(self, lobby: Lobby) -> Tuple[int, Dict[str, Any]]:
+        """Serialise a lobby under its lock; returns (updated_at, lobby dict)."""
+        with self._locks.for_key(lobby.id):
+            return lobby.updated_at, lobby.to_dict()
@@ -2,13 +2,13 @@
 
 from __future__ import annotations
 
+from collections import deque
 from threading import Lock
-from typing import TYPE_CHECKING, Dict
+from typing import TYPE_CHECKING, Deque, Dict, Set
 
 from .base import normalize_name
 
 if TYPE_CHECKING:
-    from typing import List
     from .game_service import GameService
     from ..schemas import Game
 
@@ -33,7 +33,8 @@ class MatchmakingService:
         Args:
             game_service: The game service instance for creating games
         """
-        self._queue: List[str] = []
+        self._queue: Deque[str] = deque()
+        self._queued: Set[str] = set()  # O(1) membership for self._queue
         self._matched_players: Dict[str, Game] = {}  # Track matched players for polling
         self._lock = Lock()
         self._game_service = game_service
@@ -122,19 +123,22 @@ class MatchmakingService:
         with self._lock:
             
             # Check if player is already waiting in queue
-            if player in self._queue:
+            if player in self._queued:
                 position = self._queue.index(player) + 1
                 return {"status": "queued", "position": position}
 
             # Add player to queue
             self._queue.append(player)
+            self._queued.add(player)
             
             # Match if two or more players are queued
             if len(self._queue) >= 2:
                 print(f'Matching {self._queue[0]} and {self._queue[1]}')
-                p1 = self._queue.pop(0)
-                p2 = self._queue.pop(0)
-                print(f'Queue after popping: {self._queue}')
+                p1 = self._queue.popleft()
+                p2 = self._queue.popleft()
+                self._queued.discard(p1)
+                self._queued.discard(p2)
+                print(f'Queue after popping: {list(self._queue)}')
 
             else:
                 p1 = p2 = None
@@ -176,8 +180,9 @@ class MatchmakingService:
             removed = False
             
             # Remove from queue if present
-            if player in self._queue:
+            if player in self._queued:
                 self._queue.remove(player)
+                self._queued.discard(player)
                 removed = True
             
             # Remove from matched players if present
@@ -211,7 +216,7 @@ class MatchmakingService:
         """
         player = normalize_name(player_name, field="player_name")
         with self._lock:
-            if player in self._queue:
+            if player in self._queued:
                 return self._queue.index(player) + 1
         return 0
     
@@ -238,3 +243,14 @@ class MatchmakingService:
                 print(f"🧹 Cleaned up {len(to_remove)} players from non-pending games")
             
             return len(to_remove)
+
+    def reset(self) -> None:
+        """Drop all queued and matched players (for tests and admin resets).
+        
+        Clears the queue and its membership set together so they never
+        disagree about who is waiting.
+        """
+        with self._lock:
+            self._queue.clear()
+            self._queued.clear()
+            self._matched_players.clear()
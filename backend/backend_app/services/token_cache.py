@@ -0,0 +1,108 @@
+"""Short-lived caches of verified JWTs and their users for authenticated routes."""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from threading import Lock
+from typing import Optional
+
+from bson import ObjectId
+from cachetools import TTLCache
+
+from ..models import User
+from .auth_service import auth_service
+
+TOKEN_CACHE_TTL_SECONDS = 5
+USER_CACHE_TTL_SECONDS = 60
+
+# token hash -> (User, expires_at)
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL_SECONDS)
+# str(user_id) -> User, dropped by invalidate_user() whenever the user document changes
+_user_cache: TTLCache = TTLCache(maxsize=5_000, ttl=USER_CACHE_TTL_SECONDS)
+# cachetools caches are not thread-safe and socketio runs threaded
+_lock = Lock()
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+
+
+def get_user_from_token(token: str) -> Optional[User]:
+    """Return the user for a JWT, verifying it only on a cache miss.
+
+    Args:
+        token: JWT token from the Authorization header
+
+    Returns:
+        User object if valid, None otherwise
+    """
+    key = _token_key(token)
+    now = time.time()
+
+    with _lock:
+        entry = _token_cache.get(key)
+    if entry is not None:
+        user, expires_at = entry
+        if expires_at > now:
+            return user
+
+    payload = auth_service.decode_token(token)
+    if not payload:
+        # Never cache failed verifications
+        return None
+
+    user_id = str(payload["user_id"])
+    with _lock:
+        user = _user_cache.get(user_id)
+    if user is None:
+        user = auth_service.get_user_by_id(user_id)
+        if not user:
+            return None
+
+    expires_at = min(float(payload.get("exp", now)), now + TOKEN_CACHE_TTL_SECONDS)
+    with _lock:
+        _user_cache[user_id] = user
+        _token_cache[key] = (user, expires_at)
+    return user
+
+
+def get_identity_from_token(token: str) -> Optional[User]:
+    """Return a lightweight User built from the JWT claims alone.
+
+    For routes that only need the caller's id/username: no MongoDB lookup,
+    so only id_str, email and username are populated (elo, avatar etc. keep
+    their defaults). Use get_user_from_token when the full profile matters.
+
+    Args:
+        token: JWT token from the Authorization header
+
+    Returns:
+        User object if the token is valid, None otherwise
+    """
+    with _lock:
+        entry = _token_cache.get(_token_key(token))
+    if entry is not None and entry[1] > time.time():
+        return entry[0]
+
+    payload = auth_service.decode_token(token)
+    if not payload:
+        return None
+    try:
+        user_oid = ObjectId(payload["user_id"])
+    except Exception:
+        return None
+    username = payload.get("username") or ""
+    return User(
+        email=payload.get("email") or "",
+        password="",
+        name=username,
+        username=username,
+        _id=user_oid,
+    )
+
+
+def invalidate_user(user_id) -> None:
+    """Drop a cached user after its document was modified."""
+    with _lock:
+        _user_cache.pop(str(user_id), None)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Tests for the auth service helpers that run without MongoDB.
+
+Tests:
+1. Unique-index violations map to the signup error messages
+2. Hand-signed JWTs round-trip through PyJWT in decode_token
+3. Verified tokens are cached; failed verifications are not
+4. Cached users are shared across tokens until invalidate_user()
+
+Run: python3 test_auth.py
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+import jwt
+from pymongo.errors import DuplicateKeyError
+
+from backend_app.models import User
+from backend_app.services import token_cache
+from backend_app.services.auth_service import AuthService, auth_service
+
+
+def _make_user(username: str = "alice") -> User:
+    return User(email=f"{username}@example.com", password="", name=username, username=username)
+
+
+def test_duplicate_key_messages():
+    """DuplicateKeyError.keyPattern picks the existing signup error message."""
+    print("=" * 70)
+    print("TEST: Duplicate Key Messages")
+    print("=" * 70)
+    
+    cases = [
+        ({"keyPattern": {"username": 1}, "keyValue": {"username": "alice"}}, "Username already taken"),
+        ({"keyPattern": {"email": 1}, "keyValue": {"email": "a@b.c"}}, "User with this email already exists"),
+        # Older servers omit keyPattern; email is the historical default
+        ({}, "User with this email already exists"),
+        (None, "User with this email already exists"),
+    ]
+    for details, expected in cases:
+        exc = DuplicateKeyError("E11000 duplicate key error", code=11000, details=details)
+        error = AuthService._duplicate_user_error(exc)
+        assert isinstance(error, ValueError), f"❌ Expected ValueError, got {type(error).__name__}"
+        assert str(error) == expected, f"❌ {details!r}: expected {expected!r}, got {str(error)!r}"
+        print(f"  {details!r} -> {error}")
+    
+    print("\n  ✅ Duplicate keys map to the signup messages")
+    return True
+
+
+def test_jwt_round_trip():
+    """_generate_token's hand-signed HS256 JWT verifies with PyJWT."""
+    print("\n" + "=" * 70)
+    print("TEST: JWT Round Trip")
+    print("=" * 70)
+    
+    user = _make_user()
+    now = datetime.now(timezone.utc)
+    token = auth_service._generate_token(user, now=now)
+    
+    # decode_token verifies with PyJWT, not the hand-rolled signer
+    payload = auth_service.decode_token(token)
+    assert payload is not None, "❌ decode_token rejected a fresh token"
+    assert payload["user_id"] == user.id_str, f"❌ user_id mismatch: {payload['user_id']}"
+    assert payload["email"] == user.email and payload["username"] == user.username
+    assert payload["iat"] == int(now.timestamp())
+    assert payload["exp"] == payload["iat"] + auth_service.jwt_expiration_hours * 3600
+    header = jwt.get_unverified_header(token)
+    assert header == {"alg": "HS256", "typ": "JWT"}, f"❌ Unexpected header: {header}"
+    print(f"  Claims: {sorted(payload)}")
+    
+    # Tampered and expired tokens are rejected
+    head, body, signature = token.split(".")
+    flipped = ("A" if signature[0] != "A" else "B") + signature[1:]
+    assert auth_service.decode_token(f"{head}.{body}.{flipped}") is None, "❌ Accepted a bad signature"
+    expired = auth_service._generate_token(user, now=now - timedelta(hours=25))
+    assert auth_service.decode_token(expired) is None, "❌ Accepted an expired token"
+    print("  Bad signature and expired token rejected")
+    
+    print("\n  ✅ Hand-signed JWTs verify with PyJWT")
+    return True
+
+
+class _LookupCounter:
+    """Stands in for auth_service.get_user_by_id, counting database lookups."""
+    
+    def __init__(self, user: User) -> None:
+        self.user = user
+        self.calls = 0
+    
+    def __call__(self, user_id: str):
+        self.calls += 1
+        return self.user if user_id == self.user.id_str else None
+
+
+def _clear_token_caches() -> None:
+    with token_cache._lock:
+        token_cache._token_cache.clear()
+        token_cache._user_cache.clear()
+
+
+def test_token_cache():
+    """Repeat requests with one token skip verification and the user lookup."""
+    print("\n" + "=" * 70)
+    print("TEST: Token Cache")
+    print("=" * 70)
+    
+    user = _make_user("bob")
+    token = auth_service._generate_token(user)
+    lookup = _LookupCounter(user)
+    original = auth_service.get_user_by_id
+    auth_service.get_user_by_id = lookup
+    _clear_token_caches()
+    try:
+        first = token_cache.get_user_from_token(token)
+        second = token_cache.get_user_from_token(token)
+        assert first is user and second is user, "❌ Expected the looked-up user"
+        assert lookup.calls == 1, f"❌ Expected 1 lookup, got {lookup.calls}"
+        print(f"  Two requests, {lookup.calls} lookup")
+        
+        # Cached entries also serve the claims-only identity path
+        identity = token_cache.get_identity_from_token(token)
+        assert identity is user, "❌ Identity should come from the token cache"
+        
+        # Bad tokens are never cached
+        bad = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+        assert token_cache.get_user_from_token(bad) is None, "❌ Accepted a bad token"
+        with token_cache._lock:
+            assert token_cache._token_key(bad) not in token_cache._token_cache, "❌ Cached a failure"
+        print("  Bad token rejected and not cached")
+    finally:
+        auth_service.get_user_by_id = original
+        _clear_token_caches()
+    
+    print("\n  ✅ Token cache works correctly")
+    return True
+
+
+def test_user_cache_invalidation():
+    """New tokens reuse the cached user until invalidate_user() drops it."""
+    print("\n" + "=" * 70)
+    print("TEST: User Cache Invalidation")
+    print("=" * 70)
+    
+    user = _make_user("carol")
+    lookup = _LookupCounter(user)
+    original = auth_service.get_user_by_id
+    auth_service.get_user_by_id = lookup
+    _clear_token_caches()
+    
+    def issue(seconds_ago: int) -> str:
+        # Distinct iat values give distinct tokens for the same user
+        now = datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)
+        return auth_service._generate_token(user, now=now)
+    
+    try:
+        # A second token (e.g. after re-login) misses the token cache but
+        # still hits the user cache
+        token_cache.get_user_from_token(issue(0))
+        token_cache.get_user_from_token(issue(1))
+        assert lookup.calls == 1, f"❌ Expected 1 lookup, got {lookup.calls}"
+        print(f"  Two tokens, {lookup.calls} lookup")
+        
+        # Invalidation forces the next new token to reload the user
+        token_cache.invalidate_user(user._id)
+        token_cache.get_user_from_token(issue(2))
+        assert lookup.calls == 2, f"❌ Expected a reload after invalidation, got {lookup.calls} lookups"
+        print(f"  After invalidate_user: {lookup.calls} lookups")
+    finally:
+        auth_service.get_user_by_id = original
+        _clear_token_caches()
+    
+    print("\n  ✅ User cache invalidation works correctly")
+    return True
+
+
+TESTS = [
+    ("Duplicate Key Messages", test_duplicate_key_messages),
+    ("JWT Round Trip", test_jwt_round_trip),
+    ("Token Cache", test_token_cache),
+    ("User Cache Invalidation", test_user_cache_invalidation),
+]
+
+
+def main():
+    """Run all tests."""
+    results: Dict[str, bool] = {}
+    for name, test_func in TESTS:
+        try:
+            results[name] = test_func()
+        except Exception as e:
+            print(f"\n  ❌ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            results[name] = False
+    
+    print("\n" + "=" * 70)
+    print("SUMMARY")
+    print("=" * 70)
+    for name, passed in results.items():
+        print(f"  {'✅ PASS' if passed else '❌ FAIL'}: {name}")
+    
+    return 0 if all(results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
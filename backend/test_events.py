@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the background Socket.IO emit queue (backend_app.events).
+
+Tests:
+1. Emits without an initialised Socket.IO server are skipped, not queued
+2. Queued events are dispatched in order
+3. Events are dropped once the queue is full
+
+Run: python3 test_events.py
+"""
+
+import queue
+import sys
+from typing import Dict
+
+from backend_app import events
+
+
+def _use_queue(maxsize: int) -> queue.Queue:
+    """Swap in a fresh, small queue so the test controls its contents."""
+    events._EVENT_QUEUE = queue.Queue(maxsize=maxsize)
+    return events._EVENT_QUEUE
+
+
+def _drain(q: queue.Queue) -> list:
+    drained = []
+    while True:
+        try:
+            drained.append(q.get_nowait())
+        except queue.Empty:
+            return drained
+
+
+def test_emit_without_server():
+    """No server: emits are no-ops and nothing is queued or started."""
+    print("=" * 70)
+    print("TEST 1: Emit Without Server")
+    print("=" * 70)
+    
+    q = _use_queue(10)
+    assert events.socketio.server is None, "❌ Test expects create_app() not to have run"
+    events.emit_game_event("game_x", "game_created", {"game": {}})
+    events.emit_lobby_event("lobby_x", "player_joined", {"lobby": {}})
+    assert q.empty(), "❌ Nothing should be queued without a server"
+    assert not events._worker_started, "❌ Worker should not start without a server"
+    
+    print("\n  ✅ Emits are skipped without a server")
+    return True
+
+
+def test_queue_order():
+    """Events come off the queue in the order they were emitted."""
+    print("\n" + "=" * 70)
+    print("TEST 2: Queue Order")
+    print("=" * 70)
+    
+    q = _use_queue(100)
+    sent = [(f"/ws/game/g{i % 3}", f"event_{i}", {"n": i}) for i in range(50)]
+    for item in sent:
+        assert events._enqueue(*item), "❌ Enqueue should succeed below capacity"
+    
+    assert _drain(q) == sent, "❌ Events were reordered"
+    
+    print("\n  ✅ Events keep their order")
+    return True
+
+
+def test_queue_overflow():
+    """Once full, new events are dropped and earlier ones are kept."""
+    print("\n" + "=" * 70)
+    print("TEST 3: Queue Overflow")
+    print("=" * 70)
+    
+    q = _use_queue(3)
+    accepted = [events._enqueue("/ws/lobby/l1", f"event_{i}", {}) for i in range(5)]
+    assert accepted == [True, True, True, False, False], f"❌ Unexpected accept pattern: {accepted}"
+    assert [event for _, event, _ in _drain(q)] == ["event_0", "event_1", "event_2"], \
+        "❌ Overflow should drop the newest events"
+    
+    print("\n  ✅ Overflowing events are dropped")
+    return True
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Emit Without Server", test_emit_without_server),
+        ("Queue Order", test_queue_order),
+        ("Queue Overflow", test_queue_overflow),
+    ]
+    
+    original_queue = events._EVENT_QUEUE
+    results: Dict[str, bool] = {}
+    try:
+        for name, test_func in tests:
+            try:
+                results[name] = test_func()
+            except Exception as e:
+                print(f"\n  ❌ Test failed with exception: {e}")
+                import traceback
+                traceback.print_exc()
+                results[name] = False
+    finally:
+        events._EVENT_QUEUE = original_queue
+    
+    print("\n" + "=" * 70)
+    print("SUMMARY")
+    print("=" * 70)
+    for name, passed in results.items():
+        print(f"  {'✅ PASS' if passed else '❌ FAIL'}: {name}")
+    
+    return 0 if all(results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the HTTP layer, run through Flask's test client.
+
+Tests:
+1. Game polling revalidates with the ns updated_at ETag (304 until changed)
+2. Lobby polling does the same
+
+Run: python3 test_routes.py
+"""
+
+import sys
+from typing import Dict
+
+from backend_app import create_app
+from backend_app.services import game_service, lobby_service
+
+app = create_app()
+client = app.test_client()
+
+
+def _check_revalidation(path: str, change) -> bool:
+    """GET path, revalidate with its ETag, then again after change()."""
+    first = client.get(path)
+    assert first.status_code == 200, f"❌ Expected 200, got {first.status_code}"
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"') and etag[3:-1].isdigit(), f"❌ Expected a weak ns ETag, got {etag}"
+    assert "no-cache" in first.headers["Cache-Control"], "❌ Clients must revalidate"
+    print(f"  200 with ETag {etag}")
+    
+    unchanged = client.get(path, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304, f"❌ Expected 304, got {unchanged.status_code}"
+    assert not unchanged.data, "❌ 304 must not carry a body"
+    assert unchanged.headers["ETag"] == etag
+    print("  304 while unchanged")
+    
+    change()
+    changed = client.get(path, headers={"If-None-Match": etag})
+    assert changed.status_code == 200, f"❌ Expected 200 after a change, got {changed.status_code}"
+    assert changed.headers["ETag"] != etag, "❌ ETag should move with updated_at"
+    print(f"  200 after a change, ETag {changed.headers['ETag']}")
+    return True
+
+
+def test_game_etag():
+    """GET /api/game/<id> answers 304 until the game changes."""
+    print("=" * 70)
+    print("TEST: Game ETag")
+    print("=" * 70)
+    
+    game = game_service.create_game(["EtagA", "EtagB"], source="test")
+    _check_revalidation(
+        f"/api/game/{game.id}",
+        lambda: game_service.record_prompt(game.id, "EtagA", "Make a landing page"),
+    )
+    
+    print("\n  ✅ Game polling revalidates correctly")
+    return True
+
+
+def test_lobby_etag():
+    """GET /api/lobby/<id> answers 304 until the lobby changes."""
+    print("\n" + "=" * 70)
+    print("TEST: Lobby ETag")
+    print("=" * 70)
+    
+    lobby = lobby_service.create_lobby("EtagHost")
+    _check_revalidation(
+        f"/api/lobby/{lobby.id}",
+        lambda: lobby_service.join_lobby(lobby.id, "EtagGuest"),
+    )
+    
+    print("\n  ✅ Lobby polling revalidates correctly")
+    return True
+
+
+TESTS = [
+    ("Game ETag", test_game_etag),
+    ("Lobby ETag", test_lobby_etag),
+]
+
+
+def main():
+    """Run all tests."""
+    results: Dict[str, bool] = {}
+    for name, test_func in TESTS:
+        try:
+            results[name] = test_func()
+        except Exception as e:
+            print(f"\n  ❌ Test failed with exception: {e}")
+            import traceback
+            traceback.print_exc()
+            results[name] = False
+    
+    print("\n" + "=" * 70)
+    print("SUMMARY")
+    print("=" * 70)
+    for name, passed in results.items():
+        print(f"  {'✅ PASS' if passed else '❌ FAIL'}: {name}")
+    
+    return 0 if all(results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,13 +8,22 @@ Tests:
 3. Matchmaking polling bug is fixed
 4. Game creation works
 5. All services integrate properly
+6. Completed games are evicted after the retention window
+7. AI paths validate player names like the other services
+8. Only one submission claims scoring, and a failed scorer releases it
+9. StripedLock hands each key one lock and serialises its holders
+10. PairMap behaves like a two-entry dict and rejects a third key
+11. Background submission failures are visible on the polled game
 
 Run: python3 test_services.py
 """
 
 import sys
+import threading
 from typing import Dict
 
+from bson import ObjectId
+
 # Import services
 try:
     from backend_app.services import (
@@ -25,6 +34,8 @@ try:
         ValidationError,
         NotFoundError,
     )
+    from backend_app.schemas import PairMap
+    from backend_app.services.base import StripedLock
     print("✅ All services imported successfully\n")
 except ImportError as e:
     print(f"❌ Import failed: {e}")
@@ -38,8 +49,7 @@ def test_matchmaking_bug_fix():
     print("=" * 70)
     
     # Clear any existing state
-    matchmaking_service._queue.clear()
-    matchmaking_service._matched_players.clear()
+    matchmaking_service.reset()
     
     # Step 1: Player 1 joins
     print("\n[Step 1] Player 1 joins queue...")
@@ -187,8 +197,7 @@ def test_cancel_functionality():
     print("=" * 70)
     
     # Clear state
-    matchmaking_service._queue.clear()
-    matchmaking_service._matched_players.clear()
+    matchmaking_service.reset()
     
     # Join queue
     print("\n[Player joins queue]...")
@@ -212,6 +221,232 @@ def test_cancel_functionality():
     return True
 
 
+def test_game_eviction():
+    """Test that completed games past retention are evicted from memory."""
+    print("\n" + "=" * 70)
+    print("TEST 6: Completed Game Eviction")
+    print("=" * 70)
+    
+    print("\n[Completing two games]...")
+    stale = game_service.create_game(["Evict1", "Evict2"], source="test")
+    touched = game_service.create_game(["Keep1", "Keep2"], source="test")
+    game_service.complete_game(stale.id, winner="Evict1")
+    game_service.complete_game(touched.id, winner="Keep1")
+    
+    # Touch the second game again after both completed, through a mutator
+    # that doesn't requeue it itself
+    print("\n[Touching one game again]...")
+    touched, _ = game_service.record_submission(touched.id, "Keep1", ObjectId())
+    
+    # Evict as if the retention window has passed for everything before the touch
+    print("\n[Evicting past retention]...")
+    game_service._evict_completed(touched.updated_at + game_service._retention_ns)
+    
+    try:
+        game_service.get_game(stale.id)
+        print("  ❌ Stale game is still in memory")
+        return False
+    except NotFoundError:
+        print(f"  Stale game {stale.id} evicted")
+    
+    kept = game_service.get_game(touched.id)
+    assert kept.id == touched.id, "❌ Touched game should be kept"
+    print(f"  Touched game {kept.id} kept")
+    
+    # ...but only until its latest touch ages out too
+    print("\n[Evicting past the touch's retention]...")
+    game_service._evict_completed(touched.updated_at + game_service._retention_ns + 1)
+    try:
+        game_service.get_game(touched.id)
+        print("  ❌ Touched game was never evicted")
+        return False
+    except NotFoundError:
+        print(f"  Touched game {touched.id} evicted")
+    
+    print("\n  ✅ Eviction works correctly")
+    return True
+
+
+def test_ai_name_validation():
+    """Test that AI paths share the services' player-name validation."""
+    print("\n" + "=" * 70)
+    print("TEST 7: AI Name Validation")
+    print("=" * 70)
+    
+    # One-character names are valid everywhere (1-64 characters)
+    print("\n[Resolving a one-character player]...")
+    game = game_service.create_game(["A", "B"], source="ai_test")
+    resolved = ai_service._resolve_player(game, "a")
+    assert resolved == "A", f"❌ Expected 'A', got {resolved!r}"
+    print(f"  Resolved: {resolved}")
+    
+    # Bad names raise ValidationError (a 400), not a bare ValueError
+    print("\n[Rejecting empty names]...")
+    for call in (
+        lambda: ai_service._resolve_player(game, "   "),
+        lambda: ai_service.preview_prompt("", "Make a cool website"),
+    ):
+        try:
+            call()
+        except ValidationError as exc:
+            print(f"  ValidationError: {exc}")
+        except ValueError as exc:
+            print(f"  ❌ Got ValueError instead of ValidationError: {exc}")
+            return False
+        else:
+            print("  ❌ Empty name was accepted")
+            return False
+    
+    print("\n  ✅ AI name validation works correctly")
+    return True
+
+
+def test_scoring_claim():
+    """Test that exactly one caller claims scoring and release re-opens it."""
+    print("\n" + "=" * 70)
+    print("TEST 8: Scoring Claim")
+    print("=" * 70)
+    
+    game = game_service.create_game(["Claim1", "Claim2"], source="test")
+    
+    # Nothing to score until every player has submitted
+    print("\n[Claiming with one submission]...")
+    game_service.record_submission(game.id, "Claim1", ObjectId())
+    assert game_service.claim_scoring(game.id) is None, "❌ Claimed an incomplete game"
+    print("  Not claimed (waiting on Claim2)")
+    
+    # Both submissions in: the first claim wins, the second gets None
+    print("\n[Claiming twice with both submissions]...")
+    game_service.record_submission(game.id, "claim2", ObjectId())
+    claimed = game_service.claim_scoring(game.id)
+    assert claimed is not None and claimed.status == "processing", "❌ First claim should win"
+    assert game_service.claim_scoring(game.id) is None, "❌ Second claim should lose"
+    print(f"  First claim won, status: {claimed.status}")
+    
+    # A failed scorer hands the game back so a resubmission can score it
+    print("\n[Releasing after a failed scorer]...")
+    game_service.release_scoring(game.id)
+    released = game_service.get_game(game.id)
+    assert released.status == "pending", f"❌ Should be pending, got {released.status}"
+    print(f"  Released, status: {released.status}")
+    assert game_service.claim_scoring(game.id) is not None, "❌ Released game should be claimable"
+    print("  Claimed again")
+    
+    print("\n  ✅ Scoring claim works correctly")
+    return True
+
+
+def test_striped_lock():
+    """Test that StripedLock maps keys to stable locks that exclude each other."""
+    print("\n" + "=" * 70)
+    print("TEST 9: Striped Lock")
+    print("=" * 70)
+    
+    locks = StripedLock(stripes=8)
+    
+    # The same key always gets the same lock; many keys use several stripes
+    print("\n[Mapping keys to stripes]...")
+    assert locks.for_key("game_1") is locks.for_key("game_1"), "❌ Same key, different locks"
+    stripes = {id(locks.for_key(f"game_{i}")) for i in range(100)}
+    assert 1 < len(stripes) <= 8, f"❌ Expected 2-8 stripes in use, got {len(stripes)}"
+    print(f"  100 keys over {len(stripes)} stripes")
+    
+    # Read-modify-write under the key's lock never loses an update
+    print("\n[Concurrent increments on one key]...")
+    counter = {"value": 0}
+    
+    def bump() -> None:
+        for _ in range(1000):
+            with locks.for_key("shared"):
+                value = counter["value"]
+                counter["value"] = value + 1
+    
+    threads = [threading.Thread(target=bump) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter["value"] == 8000, f"❌ Lost updates: {counter['value']}"
+    print(f"  Counter: {counter['value']}")
+    
+    print("\n  ✅ Striped lock works correctly")
+    return True
+
+
+def test_pair_map():
+    """Test PairMap's dict behaviour and its two-entry limit."""
+    print("\n" + "=" * 70)
+    print("TEST 10: PairMap")
+    print("=" * 70)
+    
+    print("\n[Dict behaviour]...")
+    pair = PairMap({"Alice": 1})
+    pair["Bob"] = 2
+    pair["Alice"] = 3  # overwrite keeps the slot
+    assert list(pair.items()) == [("Alice", 3), ("Bob", 2)], f"❌ Unexpected items: {pair!r}"
+    assert pair == {"Alice": 3, "Bob": 2} and len(pair) == 2
+    assert pair.get("Carol") is None and "Carol" not in pair
+    print(f"  {pair!r}")
+    
+    # Deleting the first entry keeps the second in order and frees a slot
+    print("\n[Delete and refill]...")
+    del pair["Alice"]
+    pair["Carol"] = 4
+    assert list(pair) == ["Bob", "Carol"], f"❌ Unexpected order: {list(pair)}"
+    try:
+        del pair["Alice"]
+        print("  ❌ Deleting a missing key should raise KeyError")
+        return False
+    except KeyError:
+        pass
+    print(f"  {pair!r}")
+    
+    print("\n[Third key]...")
+    try:
+        pair["Dave"] = 5
+        print("  ❌ A third key was accepted")
+        return False
+    except ValueError as exc:
+        print(f"  ValueError: {exc}")
+    assert dict(pair) == {"Bob": 2, "Carol": 4}, "❌ Failed insert changed the map"
+    
+    print("\n  ✅ PairMap works correctly")
+    return True
+
+
+def test_submission_errors():
+    """Test that submission failures are stored on the game until cleared."""
+    print("\n" + "=" * 70)
+    print("TEST 11: Submission Errors")
+    print("=" * 70)
+    
+    game = game_service.create_game(["Fail1", "Fail2"], source="test")
+    
+    print("\n[Recording a failure]...")
+    game_service.set_submission_error(game.id, "fail1", "Image download failed")
+    _, snapshot = game_service.snapshot_game(game)
+    assert snapshot["submission_errors"] == {"Fail1": "Image download failed"}, (
+        f"❌ Unexpected errors: {snapshot['submission_errors']}"
+    )
+    print(f"  submission_errors: {snapshot['submission_errors']}")
+    
+    print("\n[Clearing on resubmit]...")
+    before = game.updated_at
+    game_service.set_submission_error(game.id, "Fail1", None)
+    _, snapshot = game_service.snapshot_game(game)
+    assert snapshot["submission_errors"] == {}, "❌ Error should be cleared"
+    assert game.updated_at > before, "❌ Clearing should bump updated_at for pollers"
+    
+    # Clearing again is a no-op that leaves the ETag alone
+    stamp = game.updated_at
+    game_service.set_submission_error(game.id, "Fail1", None)
+    assert game.updated_at == stamp, "❌ No-op clear should not bump updated_at"
+    print("  Cleared")
+    
+    print("\n  ✅ Submission errors work correctly")
+    return True
+
+
 def main():
     """Run all tests."""
     print("\n" + "🧪" * 35)
@@ -224,6 +459,12 @@ def main():
         ("Lobby Service", test_lobby_service),
         ("AI Service", test_ai_service),
         ("Cancel Functionality", test_cancel_functionality),
+        ("Game Eviction", test_game_eviction),
+        ("AI Name Validation", test_ai_name_validation),
+        ("Scoring Claim", test_scoring_claim),
+        ("Striped Lock", test_striped_lock),
+        ("PairMap", test_pair_map),
+        ("Submission Errors", test_submission_errors),
     ]
     
     results: Dict[str, bool] = {}
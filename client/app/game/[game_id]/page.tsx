@@ -16,6 +16,8 @@ interface GameData {
   prompts: Record<string, string>;
   outputs: Record<string, string>;
   scores: Record<string, number>;
+  // Why a player's last screenshot submission failed; cleared on resubmit
+  submission_errors?: Record<string, string>;
   winner: string | null;
   status: string;
   source: string;
@@ -43,6 +45,9 @@ export default function GameplayPage() {
   const [activeTab, setActiveTab] = useState<"preview" | "html" | "css" | "js">("preview");
   const [gameCompleted, setGameCompleted] = useState(false);
   const [hasAutoSubmitted, setHasAutoSubmitted] = useState(false);
+  // Errors from sending the screenshot; failures after it was queued
+  // arrive on the polled game as submission_errors
+  const [submissionError, setSubmissionError] = useState<string | null>(null);
   const [iframeLoaded, setIframeLoaded] = useState(false);
   const [submittedPrompts, setSubmittedPrompts] = useState<string[]>([]);
   const iframeRef = useRef<HTMLIFrameElement>(null);
@@ -250,6 +255,8 @@ export default function GameplayPage() {
       return;
     }
 
+    setSubmissionError(null);
+
     try {
       console.log('📸 Starting automatic preview capture and submission...');
       
@@ -329,6 +336,10 @@ export default function GameplayPage() {
       }
 
       const data = await response.json();
+      // The queued response already has this player's previous failure cleared
+      if (data.game) {
+        setGameData(data.game);
+      }
       console.log('✅ Automatic submission successful:', data);
       console.log('🎮 Game status:', data.game?.status);
       console.log('📊 Submission data:', {
@@ -340,6 +351,7 @@ export default function GameplayPage() {
       
     } catch (err) {
       console.error('❌ Error capturing/submitting preview:', err);
+      setSubmissionError(err instanceof Error ? err.message : "Failed to submit screenshot");
       console.error('Error details:', {
         error: err instanceof Error ? err.message : 'Unknown error',
         gameId,
@@ -430,6 +442,13 @@ export default function GameplayPage() {
     return () => clearInterval(interval);
   }, [gameId, hasAutoSubmitted]);
 
+  // /ai/submit converts and scores in the background, so a failure shows up
+  // on the polled game rather than in the submit response
+  const scoringError = Object.entries(gameData?.submission_errors ?? {}).find(
+    ([player]) => player.toLowerCase() === playerName?.toLowerCase()
+  )?.[1];
+  const shownSubmissionError = submissionError ?? scoringError;
+
   // Loading state
   if (loading) {
     return (
@@ -567,6 +586,21 @@ export default function GameplayPage() {
                 </div>
               </div>
 
+              {shownSubmissionError && !gameCompleted && (
+                <div className="flex items-center justify-between gap-4 px-4 py-3 font-mono text-sm text-red-300 bg-red-950/60 border border-red-500/40 rounded-lg">
+                  <span>Your submission could not be scored: {shownSubmissionError}</span>
+                  {/* The screenshot is taken from the preview iframe */}
+                  <button
+                    onClick={() => captureAndSubmitPreview()}
+                    disabled={activeTab !== "preview"}
+                    title={activeTab !== "preview" ? "Switch to Preview to retry" : undefined}
+                    className="shrink-0 px-3 py-2 font-mono text-xs bg-white/10 text-white hover:bg-white/20 transition-colors disabled:opacity-50 disabled:pointer-events-none"
+                  >
+                    Retry submission
+                  </button>
+                </div>
+              )}
+
               {/* Tab content */}
               <div className="flex-1 bg-white rounded-lg shadow-2xl overflow-auto border-4 border-slate-400/50 min-h-0">
                 {activeTab === "preview" && (